@@ -121,7 +121,7 @@ public class DiagramCommand implements Callable<Integer> {
         int totalErrors = 0;
 
         for (Path input : inputs) {
-            if (!Files.exists(input)) {
+            if (!Files.exists(input) && !parent.isStdinFile(input)) {
                 Logger.error("  [x]  Path not found: %s%n", input);
                 totalErrors++;
                 continue;
@@ -148,7 +148,7 @@ public class DiagramCommand implements Callable<Integer> {
         Logger.info("%n%s%n  Generating diagrams for %d file(s)%n%s%n",
             "─".repeat(60), files.size(), "─".repeat(60));
 
-        SysMLEngineHelper engine = new SysMLEngineHelper(parent.getLibraryPath());
+        SysMLEngineHelper engine = parent.createEngine();
         this.injector = engine.getInjector();
 
         // Load all files into the ResourceSet (either single validate or validateAll)
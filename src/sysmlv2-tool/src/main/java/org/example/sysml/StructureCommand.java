@@ -123,7 +123,7 @@ public class StructureCommand implements Callable<Integer> {
         int errors = 0;
 
         for (Path input : inputs) {
-            if (!Files.exists(input)) {
+            if (!Files.exists(input) && !parent.isStdinFile(input)) {
                 System.err.printf("[ERROR] Path not found: %s%n", input);
                 errors++;
                 continue;
@@ -146,7 +146,7 @@ public class StructureCommand implements Callable<Integer> {
 
         // ── Load and validate ────────────────────────────────────────────────
         List<Path> files = new ArrayList<>(uniqueFiles);
-        SysMLEngineHelper engine = new SysMLEngineHelper(parent.getLibraryPath());
+        SysMLEngineHelper engine = parent.createEngine();
 
         Map<Path, SysMLEngineHelper.ValidationResult> results =
             files.size() == 1
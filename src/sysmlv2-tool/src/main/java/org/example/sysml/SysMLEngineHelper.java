@@ -13,15 +13,18 @@ import org.eclipse.xtext.validation.Issue;
 import org.omg.sysml.interactive.SysMLInteractive;
 import org.omg.sysml.interactive.SysMLInteractiveResult;
 
+import java.io.ByteArrayInputStream;
 import java.io.IOException;
 import java.io.OutputStream;
 import java.io.PrintStream;
 import java.lang.reflect.Field;
 import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
 import java.nio.file.Files;
 import java.nio.file.Path;
 import java.util.ArrayList;
 import java.util.Arrays;
+import java.util.HashMap;
 import java.util.LinkedHashMap;
 import java.util.List;
 import java.util.Map;
@@ -58,6 +61,7 @@ public class SysMLEngineHelper {
     private final Injector injector;
     private final Path resolvedLibraryPath;
     private XtextResourceSet batchResourceSet;
+    private final Map<Path, String> sourceOverrides = new HashMap<>();
 
     // -------------------------------------------------------------------------
     // Records
@@ -132,17 +136,27 @@ public class SysMLEngineHelper {
 
     public Injector getInjector() { return injector; }
 
+    /**
+     * Supplies the content of {@code file} directly (e.g. read from stdin via
+     * --stdin-file) instead of reading it from disk; the file need not exist.
+     */
+    public void overrideSource(Path file, String source) {
+        sourceOverrides.put(file.toAbsolutePath().normalize(), source);
+    }
+
     // -------------------------------------------------------------------------
     // Single-file validation
     // -------------------------------------------------------------------------
 
     public ValidationResult validate(Path sysmlFile) {
-        String source;
-        try {
-            source = Files.readString(sysmlFile);
-        } catch (IOException e) {
-            Logger.error("Cannot read '" + sysmlFile + "': " + e.getMessage());
-            return new ValidationResult(List.of(), List.of());
+        String source = sourceOverrides.get(sysmlFile.toAbsolutePath().normalize());
+        if (source == null) {
+            try {
+                source = Files.readString(sysmlFile);
+            } catch (IOException e) {
+                Logger.error("Cannot read '" + sysmlFile + "': " + e.getMessage());
+                return new ValidationResult(List.of(), List.of());
+            }
         }
         SysMLInteractiveResult result = sysml.process(source);
         List<?> issues = sysml.validate();
@@ -234,7 +248,15 @@ public class SysMLEngineHelper {
                 URI uri = URI.createFileURI(file.toAbsolutePath().normalize().toString());
                 Logger.info(" %s", file.toString().trim());
                 try {
-                    Resource resource = resourceSet.getResource(uri, true);
+                    String override = sourceOverrides.get(file.toAbsolutePath().normalize());
+                    Resource resource;
+                    if (override != null) {
+                        resource = resourceSet.createResource(uri);
+                        resource.load(new ByteArrayInputStream(override.getBytes(StandardCharsets.UTF_8)),
+                            resourceSet.getLoadOptions());
+                    } else {
+                        resource = resourceSet.getResource(uri, true);
+                    }
                     fileToResource.put(file, resource);
                     Logger.debug("  Loaded: %s  errors=%d  warnings=%d  contents=%d",
                         file.getFileName(),
@@ -1,7 +1,9 @@
 
 package org.example.sysml;
 
+import java.io.IOException;
 import java.io.InputStream;
+import java.nio.charset.StandardCharsets;
 import java.nio.file.Path;
 import java.util.Properties;
 
@@ -42,7 +44,27 @@ public class SysMLTool implements Runnable {
     @Option(names = {"-v", "--version"}, versionHelp = true, description = "Print version information and exit")
     private boolean version;
 
+    @Option(names = {"--stdin-file"}, paramLabel = "<path>",
+        description = "Read the content of <path> from stdin (UTF-8) instead of from disk")
+    private Path stdinFile;
+
+    private String stdinSource;
+
+    @Option(names = {"--daemon"}, hidden = true,
+        description = "Serve commands read as JSON lines from stdin (see ToolDaemon)")
+    private boolean daemon;
+
     public static void main(String[] args) {
+        System.exit(execute(args));
+    }
+
+    /**
+     * Parses and runs one command line and returns its exit code.
+     *
+     * A fresh SysMLTool and fresh subcommand instances are built on every call,
+     * so no option state leaks between invocations in the same JVM (see ToolDaemon).
+     */
+    static int execute(String[] args) {
         SysMLTool tool = new SysMLTool();
         CommandLine cmd = new CommandLine(tool);
         cmd.addSubcommand("validate", new ValidateCommand(tool));
@@ -50,12 +72,15 @@ public class SysMLTool implements Runnable {
         cmd.addSubcommand("views", new ViewsCommand(tool));
         cmd.addSubcommand("structure", new StructureCommand(tool));
         cmd.addSubcommand("help", new CommandLine.HelpCommand());
-        int exitCode = cmd.execute(args);
-        System.exit(exitCode);
+        return cmd.execute(args);
     }
 
     @Override
     public void run() {
+        if (daemon) {
+            ToolDaemon.serve();
+            return;
+        }
         // No subcommand given – print full usage including all registered subcommands
         spec.commandLine().usage(System.out);
     }
@@ -63,5 +88,32 @@ public class SysMLTool implements Runnable {
     public Path getLibraryPath() {
         return libraryPath;
     }
+
+    /** True if {@code path} names the file whose content is supplied via --stdin-file. */
+    public boolean isStdinFile(Path path) {
+        return stdinFile != null
+            && stdinFile.toAbsolutePath().normalize().equals(path.toAbsolutePath().normalize());
+    }
+
+    /** Creates the engine for a subcommand, with the --stdin-file content registered. */
+    public SysMLEngineHelper createEngine() {
+        SysMLEngineHelper engine = new SysMLEngineHelper(libraryPath);
+        if (stdinFile != null) {
+            engine.overrideSource(stdinFile, readStdin());
+        }
+        return engine;
+    }
+
+    private String readStdin() {
+        if (stdinSource == null) {
+            try {
+                stdinSource = new String(System.in.readAllBytes(), StandardCharsets.UTF_8);
+            } catch (IOException e) {
+                Logger.error("Cannot read '%s' from stdin: %s", stdinFile, e.getMessage());
+                stdinSource = "";
+            }
+        }
+        return stdinSource;
+    }
 }
 
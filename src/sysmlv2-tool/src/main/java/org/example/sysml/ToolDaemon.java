@@ -0,0 +1,145 @@
+package org.example.sysml;
+
+import org.json.JSONArray;
+import org.json.JSONObject;
+
+import java.io.BufferedReader;
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.io.PrintWriter;
+import java.io.StringWriter;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Path;
+
+/**
+ * Long-lived server mode, started with {@code java -jar sysmlv2-tool-fat.jar --daemon}.
+ *
+ * Starting the JVM and loading the Xtext/EMF classes costs several seconds,
+ * while a single command on a small model is comparatively cheap. The daemon
+ * pays that startup once and then runs any number of commands in-process.
+ *
+ * Protocol (one JSON object per line, UTF-8):
+ * <pre>
+ *   request : {"id": 7, "args": ["validate", "model.sysml"], "cwd": "/abs/dir", "stdin": "..."}
+ *   response: @sysml-daemon {"id": 7, "rc": 0, "out": "...", "err": "..."}
+ * </pre>
+ *
+ * Responses carry the {@link #REPLY_PREFIX} and echo the request's "id". The
+ * JVM itself may print to stdout as well (e.g. CDS warnings or -Xlog output);
+ * clients skip lines without the prefix and must treat an unexpected id as a
+ * broken connection.
+ *
+ * The daemon's own stdin carries the protocol, so the optional "stdin" field
+ * is what the command sees as {@code System.in} (e.g. for --stdin-file).
+ *
+ * Each request is executed via {@link SysMLTool#execute(String[])}, which
+ * builds fresh command objects and a fresh SysMLInteractive engine, so no
+ * option state is shared between requests. Process-wide state is not reset,
+ * though: the Xtext/EMF registries and the Guice injector SysMLInteractive
+ * keeps in a static field live as long as the daemon. The regression suite
+ * therefore compares daemon results with one-shot runs of the same command.
+ * stdout and stderr of the command are captured into the response; the
+ * protocol itself is written to the process' original stdout.
+ *
+ * A JVM cannot change its working directory, so a request whose "cwd" differs
+ * from the daemon's own is rejected with rc=2 and the client is expected to
+ * fall back to a one-shot process. The daemon exits when stdin is closed.
+ */
+public class ToolDaemon {
+
+    /** Marks protocol lines on stdout; anything else there is not a response. */
+    public static final String REPLY_PREFIX = "@sysml-daemon ";
+
+    private ToolDaemon() {}
+
+    public static void serve() {
+        PrintStream protocol = new PrintStream(
+            new FileOutputStream(FileDescriptor.out), true, StandardCharsets.UTF_8);
+        BufferedReader in = new BufferedReader(
+            new InputStreamReader(System.in, StandardCharsets.UTF_8));
+
+        try {
+            String line;
+            while ((line = in.readLine()) != null) {
+                if (line.isBlank()) continue;
+                protocol.println(REPLY_PREFIX + handle(line));
+                protocol.flush();
+            }
+        } catch (IOException e) {
+            Logger.error("Daemon input failed: %s", e.getMessage());
+        }
+    }
+
+    private static JSONObject handle(String line) {
+        Object id = JSONObject.NULL;
+        String[] args;
+        String stdin;
+        try {
+            JSONObject request = new JSONObject(line);
+            id = request.opt("id");
+            String cwd = request.optString("cwd", null);
+            if (cwd != null && !isWorkingDirectory(cwd)) {
+                return response(id, 2, "", "[ERROR] Daemon cannot run in '" + cwd + "'; "
+                    + "working directory is " + Path.of("").toAbsolutePath() + System.lineSeparator());
+            }
+            JSONArray argv = request.getJSONArray("args");
+            args = new String[argv.length()];
+            for (int i = 0; i < args.length; i++) args[i] = argv.getString(i);
+            stdin = request.optString("stdin", "");
+        } catch (Exception e) {
+            return response(id, 2, "", "[ERROR] Invalid daemon request: " + e.getMessage() + System.lineSeparator());
+        }
+
+        ByteArrayOutputStream out = new ByteArrayOutputStream();
+        ByteArrayOutputStream err = new ByteArrayOutputStream();
+        PrintStream originalOut = System.out;
+        PrintStream originalErr = System.err;
+        InputStream originalIn = System.in;
+        int rc;
+        try {
+            System.setIn(new ByteArrayInputStream(stdin.getBytes(StandardCharsets.UTF_8)));
+            System.setOut(new PrintStream(out, true, StandardCharsets.UTF_8));
+            System.setErr(new PrintStream(err, true, StandardCharsets.UTF_8));
+            rc = SysMLTool.execute(args);
+        } catch (Throwable t) {
+            StringWriter sw = new StringWriter();
+            t.printStackTrace(new PrintWriter(sw));
+            System.err.print(sw);
+            rc = 1;
+        } finally {
+            System.out.flush();
+            System.err.flush();
+            System.setOut(originalOut);
+            System.setErr(originalErr);
+            System.setIn(originalIn);
+        }
+
+        // Report the code the way a process exit status would be seen (0..255),
+        // so that e.g. "return -1" matches a one-shot run.
+        return response(id, rc & 0xFF,
+            out.toString(StandardCharsets.UTF_8),
+            err.toString(StandardCharsets.UTF_8));
+    }
+
+    private static boolean isWorkingDirectory(String cwd) {
+        try {
+            return Path.of(cwd).toRealPath().equals(Path.of("").toRealPath());
+        } catch (IOException e) {
+            return false;
+        }
+    }
+
+    private static JSONObject response(Object id, int rc, String out, String err) {
+        return new JSONObject()
+            .put("id", id == null ? JSONObject.NULL : id)
+            .put("rc", rc)
+            .put("out", out)
+            .put("err", err);
+    }
+}
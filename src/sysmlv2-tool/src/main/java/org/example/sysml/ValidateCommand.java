@@ -76,7 +76,7 @@ public class ValidateCommand implements Callable<Integer> {
         int totalErrors = 0;
 
         for (Path input : inputs) {
-            if (!Files.exists(input)) {
+            if (!Files.exists(input) && !parent.isStdinFile(input)) {
                 Logger.error("  [x]  Path not found: %s%n", input);
                 totalErrors++;
                 continue;
@@ -104,7 +104,7 @@ public class ValidateCommand implements Callable<Integer> {
         // Convert to list after deduplication
         List<Path> files = new ArrayList<>(uniqueFiles);
 
-        SysMLEngineHelper engine = new SysMLEngineHelper(parent.getLibraryPath());
+        SysMLEngineHelper engine = parent.createEngine();
 
         // Route: single file → simple validate(); multiple files → validateAll().
         Map<Path, SysMLEngineHelper.ValidationResult> results;
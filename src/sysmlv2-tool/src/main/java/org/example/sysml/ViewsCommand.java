@@ -46,14 +46,14 @@ public class ViewsCommand implements Callable<Integer> {
 
     @Override
     public Integer call() {
-        SysMLEngineHelper engine = new SysMLEngineHelper(parent.getLibraryPath());
+        SysMLEngineHelper engine = parent.createEngine();
 
         // Collect all input files (expand directories)
         Set<Path> uniqueFiles = new LinkedHashSet<>();
         int scanErrors = 0;
 
         for (Path input : inputs) {
-            if (!Files.exists(input)) {
+            if (!Files.exists(input) && !parent.isStdinFile(input)) {
                 System.err.printf("  [x] Path not found: %s%n", input);
                 scanErrors++;
                 continue;
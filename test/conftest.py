@@ -3,31 +3,38 @@ pytest configuration for sysmlv2-tool regression tests.
 
 Performs a pre-flight check before any test is collected so that a missing
 JAR produces a single clear message instead of 46 individual subprocess
-errors.
+errors. The controlling pytest process also dumps the AppCDS archive shared
+by all tool JVMs, and every test process stops its tool daemon at the end of
+the session (see tool_runner.py).
 """
 
-import shutil
-from pathlib import Path
+import os
 
-_JAR = (
-    Path(__file__).parent.parent
-    / "src"
-    / "sysmlv2-tool-assembly"
-    / "target"
-    / "sysmlv2-tool-fat.jar"
-)
+import pytest
+
+from tool_runner import JAR, JAVA, close_shared_daemon, ensure_cds_archive
 
 
 def pytest_configure(config):
     missing = []
-    if not _JAR.exists():
+    if not os.path.isfile(JAR):
         missing.append(
-            f"JAR not found: {_JAR}\n"
+            f"JAR not found: {JAR}\n"
             "  Build first: cd src && mvn compile package"
         )
-    if shutil.which("java") is None:
+    if not JAVA:
         missing.append("'java' not found on PATH")
+    elif not (os.path.isfile(JAVA) and os.access(JAVA, os.X_OK)):
+        missing.append(f"java is not an executable file: {JAVA} (check SYSML_JAVA_BIN)")
 
     if missing:
-        import pytest
         pytest.exit("\n".join(["Pre-flight check failed:"] + missing), returncode=2)
+
+    # xdist workers inherit the archive dumped by the controller; a
+    # --collect-only run starts no tool JVM, so it does not need one.
+    if not hasattr(config, "workerinput") and not config.option.collectonly:
+        ensure_cds_archive()
+
+
+def pytest_unconfigure(config):
+    close_shared_daemon()
@@ -2,61 +2,312 @@
 """
 Black-box regression tests for sysmlv2-tool.
 
-Runs the fat JAR via subprocess and validates exit codes and output.
-Each JVM startup takes a few seconds; the full suite is expected to take
-a couple of minutes.
+Runs the fat JAR and validates exit codes and output. All invocations go
+to one long-lived ``--daemon`` JVM per pytest session (see tool_runner.py);
+with SYSML_NO_DAEMON=1 every call is a separate ``java -jar`` process. Each
+JVM startup takes a few seconds; the full suite is expected to take a
+couple of minutes when run serially without the daemon.
+
+Tests share no state (every diagram test writes into its own output
+directory below a per-class temporary directory), so the suite can be
+fanned out across CPU cores with pytest-xdist (see test/requirements.txt).
+Outputs shared by several tests come from module-scoped fixtures;
+``--dist loadscope`` keeps each class on one worker so such an output is
+produced once rather than once per worker.
 
 Usage (from project root):
     python test/test_regression.py
+    pytest -n auto --dist loadscope test/test_regression.py
 
 Usage (from test/ directory):
     python test_regression.py
 
 Requirements:
     - Python 3.8+
+    - pytest + pytest-xdist for parallel runs:  pip install -r test/requirements.txt
     - 'java' available on PATH
     - JAR built at:  src/sysmlv2-tool-assembly/target/sysmlv2-tool-fat.jar
       Build with:    cd src && mvn compile package
 """
 
 import json
+import os
 import re
 import shutil
 import subprocess
 import sys
-import tempfile
-import unittest
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import pytest
+
+from tool_runner import JvmDaemon, disk_cached, java_command, shared_daemon
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_ROOT = SCRIPT_DIR.parent
-JAR = PROJECT_ROOT / "src" / "sysmlv2-tool-assembly" / "target" / "sysmlv2-tool-fat.jar"
 TEST_MODEL = PROJECT_ROOT / "test" / "test_model"
 DEP_MODEL = PROJECT_ROOT / "test" / "dependency_test_model"
 
 
+# ---------------------------------------------------------------------------
+# Output patterns
+# ---------------------------------------------------------------------------
+RE_VERSION = re.compile(r"\d+\.\d+")
+RE_SAFETY_VIEWS = re.compile(r"software.*view|hardware.*view|SafetyView|safetyView", re.I)
+RE_JAVA_STACK = re.compile(r"at org\.|at java\.")
+RE_TSC001_DEPENDENCY = re.compile(r"TSC001.*dependency|dependency.*TSC001")
+RE_FSC001_DEPENDENCY = re.compile(r"FSC001.*dependency|dependency.*FSC001|TSC001.*FSC001")
+RE_FSC001_SATISFY = re.compile(r"satisfy.*FSC001|FSC001.*satisfy")
+RE_TSC001_SATISFY = re.compile(r"satisfy.*TSC001|TSC001.*satisfy")
+RE_PROJECT_REQUIREMENTS_NODE = re.compile(r"ProjectRequirements\s+\[")
+RE_SYSTEM_MODEL_NODE = re.compile(r"SystemModel\s+\[")
+
+# Literal keywords, matched case-insensitively with contains_any().
+KW_USAGE = ("usage", "validate", "diagram", "views")
+KW_HELP_VALIDATE = ("validate",)
+KW_HELP_DIAGRAM = ("diagram", "element", "view")
+KW_HELP_VIEWS = ("view",)
+KW_HELP_STRUCTURE = ("structure", "format", "json")
+KW_SYNTAX_ERROR = ("error", "invalid", "fail", "syntax", "parse")
+KW_TYPE_ERROR = ("error", "invalid", "fail", "type", "unknown")
+KW_FOLDER_ERROR = ("error", "invalid", "fail", "syntax")
+KW_TESTSUITE = ("testsuite",)
+KW_XML_FAILURE = ("failure", "error")
+KW_VIEW_SECTION = ("viewusage", "viewdefinition")
+KW_EXPOSED = ("expose", "sws001", "tsc001", "hws001")
+PACKAGE_LABEL = "[Package]"
+
+
+# ---------------------------------------------------------------------------
+# Tool invocations
+#
+# Input paths are stringified once, and every read-only invocation used by
+# the suite is a ready-made, hashable argv tuple (also cheap to key on for
+# the disk cache).
+# ---------------------------------------------------------------------------
+TEST_EMPTY_FILE = str(TEST_MODEL / "test_empty.sysml")
+TEST_VIEWS_FILE = str(TEST_MODEL / "test_views.sysml")
+DEP_MODEL_DIR = str(DEP_MODEL)
+DEP_REQUIREMENTS_FILE = str(DEP_MODEL / "req" / "requirements.sysml")
+
+_FROZEN_ARGS = {
+    "version_short": ("-v",),
+    "version_long": ("--version",),
+    "no_args": (),
+    "help_validate": ("help", "validate"),
+    "help_diagram": ("help", "diagram"),
+    "help_views": ("help", "views"),
+    "help_structure": ("help", "structure"),
+    "validate_empty": ("validate", TEST_EMPTY_FILE),
+    "validate_scalar_values": ("validate", str(TEST_MODEL / "test_ScalarValues.sysml")),
+    "validate_views": ("validate", TEST_VIEWS_FILE),
+    "validate_syntax_error": ("validate", str(TEST_MODEL / "test_syntax_error.sysml")),
+    "validate_invalid_type": ("validate", str(TEST_MODEL / "test_invalid_type.sysml")),
+    "validate_xml_empty": ("validate", "-f", "xml", TEST_EMPTY_FILE),
+    "validate_xml_syntax_error": (
+        "validate", "-f", "xml", str(TEST_MODEL / "test_syntax_error.sysml"),
+    ),
+    "validate_test_model": ("validate", str(TEST_MODEL)),
+    "validate_dep_model": ("validate", DEP_MODEL_DIR),
+    "validate_xml_dep_model": ("validate", "-f", "xml", DEP_MODEL_DIR),
+    "views_test_views": ("views", TEST_VIEWS_FILE),
+    "views_dep_model": ("views", DEP_MODEL_DIR),
+    "structure": ("structure", DEP_MODEL_DIR),
+    "structure_text": ("structure", "-f", "text", DEP_MODEL_DIR),
+    "structure_json": ("structure", "-f", "json", DEP_MODEL_DIR),
+    "structure_xml": ("structure", "-f", "xml", DEP_MODEL_DIR),
+    "structure_single_file": ("structure", DEP_REQUIREMENTS_FILE),
+    "structure_missing_path": ("structure", "/nonexistent/path.sysml"),
+    "structure_relations": ("structure", "--relations", DEP_MODEL_DIR),
+    "structure_relations_text": ("structure", "--relations", "-f", "text", DEP_MODEL_DIR),
+    "structure_relations_json": ("structure", "--relations", "-f", "json", DEP_MODEL_DIR),
+}
+
+# Invocations checked only for their exit code (see check_exit_code). ``key``
+# names both the _FROZEN_ARGS entry and its ``<key>_output`` fixture; expected
+# rc None means "any non-zero". Each list belongs to the structure test class
+# that uses the same fixtures, so --dist loadscope runs an invocation on one
+# worker only.
+RunSpec = namedtuple("RunSpec", "name key expected_rc description")
+
+STRUCTURE_TEXT_RUN_SPECS = [
+    RunSpec("text_format_exits_zero", "structure", 0,
+            "structure on dep model should exit 0"),
+    RunSpec("text_format_explicit_flag_exits_zero", "structure_text", 0,
+            "structure -f text should exit 0"),
+    RunSpec("text_single_file_exits_zero", "structure_single_file", 0,
+            "structure on single .sysml file should exit 0"),
+    RunSpec("unknown_format_rejected", "structure_xml", None,
+            "structure -f xml (unknown format) should exit non-zero"),
+    RunSpec("missing_path_rejected", "structure_missing_path", None,
+            "structure on a non-existent path should exit non-zero"),
+]
+
+STRUCTURE_JSON_RUN_SPECS = [
+    RunSpec("json_format_exits_zero", "structure_json", 0,
+            "structure -f json should exit 0"),
+]
+
+STRUCTURE_RELATIONS_RUN_SPECS = [
+    RunSpec("relations_flag_exits_zero", "structure_relations", 0,
+            "structure --relations should exit 0"),
+    RunSpec("relations_flag_json_exits_zero", "structure_relations_json", 0,
+            "structure --relations -f json should exit 0"),
+]
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+@disk_cached
 def run_tool(*args, cwd=None):
     """Run the sysmlv2-tool JAR with the given arguments.
 
     Returns (returncode, stdout, stderr).
     The tool is always started from PROJECT_ROOT so that the standard
     library is found automatically via the relative paths in SysMLEngineHelper.
+    Under pytest the call is served by the shared JVM daemon; a one-shot
+    ``java -jar`` process is used when no daemon is available. Read-only
+    calls are memoized on disk across runs (see tool_runner.disk_cached).
     """
-    cmd = ["java", "-jar", str(JAR)] + [str(a) for a in args]
+    daemon = shared_daemon()
+    if daemon is not None:
+        result = daemon.send(args, cwd=cwd or PROJECT_ROOT)
+        if result is not None:
+            return result
+    return run_tool_oneshot(*args, cwd=cwd)
+
+
+def run_tool_oneshot(*args, cwd=None, stdin=None):
+    """Run the tool as its own ``java -jar`` process, exactly as a user would.
+
+    ``stdin`` (str) is piped to the process as UTF-8. Returns
+    (returncode, stdout, stderr); never uses the daemon or the cache.
+    """
+    # Capture raw bytes and decode once as UTF-8 (what the JVM is told to emit)
+    # instead of going through the locale codec and newline translation.
     result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
+        java_command(*args),
+        input=stdin.encode("utf-8") if stdin is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         cwd=str(cwd or PROJECT_ROOT),
     )
-    return result.returncode, result.stdout, result.stderr
+    return (
+        result.returncode,
+        result.stdout.decode("utf-8", "replace"),
+        result.stderr.decode("utf-8", "replace"),
+    )
+
+
+def run_tool_rc(*args, cwd=None):
+    """Run the tool for its side effects and return only the exit code.
+
+    For tests that inspect written files: a one-shot run sends stdout/stderr
+    to /dev/null instead of piping output nobody reads. The daemon, when
+    available, is still preferred since it avoids starting a JVM at all.
+    """
+    daemon = shared_daemon()
+    if daemon is not None:
+        result = daemon.send(args, cwd=cwd or PROJECT_ROOT)
+        if result is not None:
+            return result[0]
+    return subprocess.call(
+        java_command(*args),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=str(cwd or PROJECT_ROOT),
+    )
+
+
+# Rough resident size of one tool JVM with the standard library loaded.
+_JVM_FOOTPRINT = 300 * 1024 * 1024
+
+
+def _available_memory():
+    """MemAvailable from /proc/meminfo in bytes, or None where it is unknown.
+
+    Unlike MemFree this includes page cache the kernel can reclaim, which on
+    a normal Linux box is most of the memory not in use.
+    """
+    try:
+        with open("/proc/meminfo", encoding="ascii") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):  # not Linux
+        pass
+    return None
+
+
+def _max_parallel_jvms():
+    """How many tool JVMs this process may run in available memory (at least one).
+
+    Every xdist worker sees the same MemAvailable, so the budget is split
+    evenly between them.
+    """
+    available = _available_memory()
+    if available is None:
+        return os.cpu_count() or 1
+    workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+    return max(1, available // workers // _JVM_FOOTPRINT)
+
+
+def run_tool_many(call_specs):
+    """Run independent run_tool() calls; results in call order.
+
+    Each spec is an argument tuple for run_tool(). The daemon answers one
+    call at a time, so while it is running the calls simply go to it in
+    order. Without it (SYSML_NO_DAEMON=1, or after it failed) each call is a
+    one-shot JVM, and those are started in parallel threads (blocked in
+    subprocess I/O with the GIL released), capped by CPU count and by
+    available memory.
+    """
+    call_specs = list(call_specs)
+    if not call_specs:
+        return []
+    if shared_daemon() is not None:
+        return [run_tool(*spec) for spec in call_specs]
+    workers = min(len(call_specs), os.cpu_count() or 1, _max_parallel_jvms())
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda spec: run_tool(*spec), call_specs))
+
+
+def any_file(root, suffix=None):
+    """True if any file (ending in ``suffix``, if given) exists below ``root``.
+
+    Walks with os.scandir and stops at the first match instead of listing
+    the whole tree.
+    """
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif suffix is None or entry.name.endswith(suffix):
+                    return True
+    return False
+
+
+def check_exit_code(spec, request):
+    """Assert the exit code of a RunSpec, taken from its module fixture."""
+    rc, out, err = request.getfixturevalue(f"{spec.key}_output")
+    if spec.expected_rc is None:
+        assert rc != 0, fail_msg(spec.description, rc, out, err)
+    else:
+        assert rc == spec.expected_rc, fail_msg(spec.description, rc, out, err)
+
+
+def contains_any(text, *needles):
+    """True if any of the lower-case ``needles`` occurs in ``text``, ignoring case."""
+    low = text.lower()
+    return any(n in low for n in needles)
 
 
 def combined(out, err):
@@ -74,591 +325,662 @@ def fail_msg(description, rc, out, err, max_chars=600):
     )
 
 
+# ---------------------------------------------------------------------------
+# Shared outputs
+#
+# Each fixture runs the tool once per module for one (command, input) pair;
+# every test asserting on that output receives the same (rc, out, err).
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def version_short_output():
+    return run_tool(*_FROZEN_ARGS["version_short"])
+
+
+@pytest.fixture(scope="module")
+def version_long_output():
+    return run_tool(*_FROZEN_ARGS["version_long"])
+
+
+@pytest.fixture(scope="module")
+def no_args_output():
+    return run_tool(*_FROZEN_ARGS["no_args"])
+
+
+@pytest.fixture(scope="module")
+def help_validate_output():
+    return run_tool(*_FROZEN_ARGS["help_validate"])
+
+
+@pytest.fixture(scope="module")
+def help_diagram_output():
+    return run_tool(*_FROZEN_ARGS["help_diagram"])
+
+
+@pytest.fixture(scope="module")
+def help_views_output():
+    return run_tool(*_FROZEN_ARGS["help_views"])
+
+
+@pytest.fixture(scope="module")
+def help_structure_output():
+    return run_tool(*_FROZEN_ARGS["help_structure"])
+
+
+@pytest.fixture(scope="module")
+def validate_empty_output():
+    return run_tool(*_FROZEN_ARGS["validate_empty"])
+
+
+@pytest.fixture(scope="module")
+def validate_scalar_values_output():
+    return run_tool(*_FROZEN_ARGS["validate_scalar_values"])
+
+
+@pytest.fixture(scope="module")
+def validate_views_output():
+    return run_tool(*_FROZEN_ARGS["validate_views"])
+
+
+@pytest.fixture(scope="module")
+def validate_syntax_error_output():
+    return run_tool(*_FROZEN_ARGS["validate_syntax_error"])
+
+
+@pytest.fixture(scope="module")
+def validate_invalid_type_output():
+    return run_tool(*_FROZEN_ARGS["validate_invalid_type"])
+
+
+@pytest.fixture(
+    scope="module",
+    params=[
+        # (invocation, expected rc — None means "any non-zero", expected XML content)
+        ("validate_xml_empty", 0, KW_TESTSUITE),
+        ("validate_xml_syntax_error", None, KW_XML_FAILURE),
+    ],
+    ids=lambda param: param[0],
+)
+def xml_validate_result(request):
+    """``validate -f xml`` once per file: (rc, out, err, expected_rc, expected_kw)."""
+    key, expected_rc, expected_kw = request.param
+    rc, out, err = run_tool(*_FROZEN_ARGS[key])
+    return rc, out, err, expected_rc, expected_kw
+
+
+@pytest.fixture(scope="module")
+def validate_folder_outputs():
+    """validate on the model folders via run_tool_many(); keyed by short name."""
+    names = ("test_model", "dep_model", "dep_model_xml")
+    results = run_tool_many([
+        _FROZEN_ARGS["validate_test_model"],
+        _FROZEN_ARGS["validate_dep_model"],
+        _FROZEN_ARGS["validate_xml_dep_model"],
+    ])
+    return dict(zip(names, results))
+
+
+@pytest.fixture(scope="module")
+def views_test_views_output():
+    return run_tool(*_FROZEN_ARGS["views_test_views"])
+
+
+@pytest.fixture(scope="module")
+def views_dep_model_output():
+    return run_tool(*_FROZEN_ARGS["views_dep_model"])
+
+
+@pytest.fixture(scope="module")
+def structure_output():
+    return run_tool(*_FROZEN_ARGS["structure"])
+
+
+@pytest.fixture(scope="module")
+def structure_text_output():
+    return run_tool(*_FROZEN_ARGS["structure_text"])
+
+
+@pytest.fixture(scope="module")
+def structure_single_file_output():
+    return run_tool(*_FROZEN_ARGS["structure_single_file"])
+
+
+@pytest.fixture(scope="module")
+def structure_json_output():
+    return run_tool(*_FROZEN_ARGS["structure_json"])
+
+
+@pytest.fixture(scope="module")
+def structure_relations_output():
+    return run_tool(*_FROZEN_ARGS["structure_relations"])
+
+
+@pytest.fixture(scope="module")
+def structure_relations_text_output():
+    return run_tool(*_FROZEN_ARGS["structure_relations_text"])
+
+
+@pytest.fixture(scope="module")
+def structure_relations_json_output():
+    return run_tool(*_FROZEN_ARGS["structure_relations_json"])
+
+
+@pytest.fixture(scope="module")
+def structure_xml_output():
+    return run_tool(*_FROZEN_ARGS["structure_xml"])
+
+
+@pytest.fixture(scope="module")
+def structure_missing_path_output():
+    return run_tool(*_FROZEN_ARGS["structure_missing_path"])
+
+
+@pytest.fixture(scope="class")
+def class_tmp(tmp_path_factory):
+    """One temporary directory per diagram test class, removed at class teardown."""
+    path = tmp_path_factory.mktemp("sysmltest_diag")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def outdir(class_tmp, request):
+    """Fresh output directory for one test, below its class' shared directory."""
+    path = class_tmp / request.node.name
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture(scope="class")
+def diagram_view_outputs(class_tmp):
+    """Render each view used by TestDiagramView via run_tool_many().
+
+    Maps view name to ((rc, out, err), outdir); every view is written into
+    its own directory.
+    """
+    sources = {
+        "softwareView": TEST_VIEWS_FILE,
+        "hardwareView": TEST_VIEWS_FILE,
+        "softwareSafetyView": DEP_MODEL_DIR,
+    }
+    outdirs = {}
+    for name in sources:
+        outdirs[name] = class_tmp / name
+        outdirs[name].mkdir()
+    results = run_tool_many(
+        ("diagram", "--view", name, "-o", outdirs[name], source)
+        for name, source in sources.items()
+    )
+    return {name: (result, str(outdirs[name])) for name, result in zip(sources, results)}
+
+
 # ---------------------------------------------------------------------------
 # Test suites
 # ---------------------------------------------------------------------------
 
-class TestVersionAndHelp(unittest.TestCase):
+class TestVersionAndHelp:
     """Basic sanity: the tool responds to --version and produces help text."""
 
-    def test_version_short_flag(self):
-        rc, out, err = run_tool("-v")
-        self.assertEqual(rc, 0, fail_msg("'-v' should exit 0", rc, out, err))
-        self.assertRegex(
-            combined(out, err), r"\d+\.\d+",
-            "Expected a version number (x.y) in -v output",
+    def test_version_short_flag(self, version_short_output):
+        rc, out, err = version_short_output
+        assert rc == 0, fail_msg("'-v' should exit 0", rc, out, err)
+        assert RE_VERSION.search(combined(out, err)), (
+            "Expected a version number (x.y) in -v output"
         )
 
-    def test_version_long_flag(self):
-        rc, out, err = run_tool("--version")
-        self.assertEqual(rc, 0, fail_msg("'--version' should exit 0", rc, out, err))
-        self.assertRegex(
-            combined(out, err), r"\d+\.\d+",
-            "Expected a version number (x.y) in --version output",
+    def test_version_long_flag(self, version_long_output):
+        rc, out, err = version_long_output
+        assert rc == 0, fail_msg("'--version' should exit 0", rc, out, err)
+        assert RE_VERSION.search(combined(out, err)), (
+            "Expected a version number (x.y) in --version output"
         )
 
-    def test_no_args_shows_usage(self):
+    def test_no_args_shows_usage(self, no_args_output):
         """Running with no arguments should print usage / available commands."""
-        rc, out, err = run_tool()
-        c = combined(out, err)
-        self.assertRegex(
-            c, r"(?i)usage|validate|diagram|views",
-            "Expected usage / command names when run with no arguments",
+        rc, out, err = no_args_output
+        assert contains_any(combined(out, err), *KW_USAGE), (
+            "Expected usage / command names when run with no arguments"
         )
 
-    def test_help_validate(self):
-        rc, out, err = run_tool("help", "validate")
-        c = combined(out, err)
-        self.assertRegex(c, r"(?i)validate", "Expected 'validate' in help output")
+    def test_help_validate(self, help_validate_output):
+        rc, out, err = help_validate_output
+        assert contains_any(combined(out, err), *KW_HELP_VALIDATE), (
+            "Expected 'validate' in help output"
+        )
 
-    def test_help_diagram(self):
-        rc, out, err = run_tool("help", "diagram")
-        c = combined(out, err)
-        self.assertRegex(
-            c, r"(?i)diagram|element|view",
-            "Expected 'diagram' keyword in diagram help output",
+    def test_help_diagram(self, help_diagram_output):
+        rc, out, err = help_diagram_output
+        assert contains_any(combined(out, err), *KW_HELP_DIAGRAM), (
+            "Expected 'diagram' keyword in diagram help output"
         )
 
-    def test_help_views(self):
-        rc, out, err = run_tool("help", "views")
-        c = combined(out, err)
-        self.assertRegex(c, r"(?i)view", "Expected 'view' keyword in views help output")
+    def test_help_views(self, help_views_output):
+        rc, out, err = help_views_output
+        assert contains_any(combined(out, err), *KW_HELP_VIEWS), (
+            "Expected 'view' keyword in views help output"
+        )
 
 
 # ---------------------------------------------------------------------------
 
-class TestValidateSingleFile(unittest.TestCase):
+class TestValidateSingleFile:
     """validate command on individual .sysml files."""
 
     # --- Valid files --------------------------------------------------------
 
-    def test_empty_file_exits_zero(self):
-        rc, out, err = run_tool("validate", TEST_MODEL / "test_empty.sysml")
-        self.assertEqual(
-            rc, 0,
-            fail_msg("test_empty.sysml should validate cleanly", rc, out, err),
-        )
+    def test_empty_file_exits_zero(self, validate_empty_output):
+        rc, out, err = validate_empty_output
+        assert rc == 0, fail_msg("test_empty.sysml should validate cleanly", rc, out, err)
 
-    def test_scalar_values_exits_zero(self):
-        rc, out, err = run_tool("validate", TEST_MODEL / "test_ScalarValues.sysml")
-        self.assertEqual(
-            rc, 0,
-            fail_msg("test_ScalarValues.sysml should validate cleanly", rc, out, err),
+    def test_scalar_values_exits_zero(self, validate_scalar_values_output):
+        rc, out, err = validate_scalar_values_output
+        assert rc == 0, (
+            fail_msg("test_ScalarValues.sysml should validate cleanly", rc, out, err)
         )
 
-    def test_views_file_exits_zero(self):
-        rc, out, err = run_tool("validate", TEST_MODEL / "test_views.sysml")
-        self.assertEqual(
-            rc, 0,
-            fail_msg("test_views.sysml should validate cleanly", rc, out, err),
-        )
+    def test_views_file_exits_zero(self, validate_views_output):
+        rc, out, err = validate_views_output
+        assert rc == 0, fail_msg("test_views.sysml should validate cleanly", rc, out, err)
 
     # --- Invalid files (must fail) -----------------------------------------
 
-    def test_syntax_error_exits_nonzero(self):
-        rc, out, err = run_tool("validate", TEST_MODEL / "test_syntax_error.sysml")
-        self.assertNotEqual(
-            rc, 0,
-            fail_msg(
-                "test_syntax_error.sysml must fail validation (non-zero exit)",
-                rc, out, err,
-            ),
+    def test_syntax_error_exits_nonzero(self, validate_syntax_error_output):
+        rc, out, err = validate_syntax_error_output
+        assert rc != 0, fail_msg(
+            "test_syntax_error.sysml must fail validation (non-zero exit)",
+            rc, out, err,
         )
 
-    def test_syntax_error_output_mentions_error(self):
-        rc, out, err = run_tool("validate", TEST_MODEL / "test_syntax_error.sysml")
-        self.assertRegex(
-            combined(out, err).lower(),
-            r"error|invalid|fail|syntax|parse",
-            "Expected an error message for test_syntax_error.sysml",
+    def test_syntax_error_output_mentions_error(self, validate_syntax_error_output):
+        rc, out, err = validate_syntax_error_output
+        assert contains_any(combined(out, err), *KW_SYNTAX_ERROR), (
+            "Expected an error message for test_syntax_error.sysml"
         )
 
-    def test_invalid_type_exits_nonzero(self):
-        rc, out, err = run_tool("validate", TEST_MODEL / "test_invalid_type.sysml")
-        self.assertNotEqual(
-            rc, 0,
-            fail_msg(
-                "test_invalid_type.sysml must fail validation (non-zero exit)",
-                rc, out, err,
-            ),
+    def test_invalid_type_exits_nonzero(self, validate_invalid_type_output):
+        rc, out, err = validate_invalid_type_output
+        assert rc != 0, fail_msg(
+            "test_invalid_type.sysml must fail validation (non-zero exit)",
+            rc, out, err,
         )
 
-    def test_invalid_type_output_mentions_error(self):
-        rc, out, err = run_tool("validate", TEST_MODEL / "test_invalid_type.sysml")
-        self.assertRegex(
-            combined(out, err).lower(),
-            r"error|invalid|fail|type|unknown",
-            "Expected an error message for test_invalid_type.sysml",
+    def test_invalid_type_output_mentions_error(self, validate_invalid_type_output):
+        rc, out, err = validate_invalid_type_output
+        assert contains_any(combined(out, err), *KW_TYPE_ERROR), (
+            "Expected an error message for test_invalid_type.sysml"
         )
 
     # --- Output format: XML -------------------------------------------------
 
-    def test_xml_format_valid_file_exits_zero(self):
-        rc, out, err = run_tool(
-            "validate", "-f", "xml", TEST_MODEL / "test_empty.sysml"
-        )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("validate -f xml on valid file should exit 0", rc, out, err),
-        )
+    def test_xml_format_exit_code(self, xml_validate_result):
+        """Valid files exit 0, invalid files must fail."""
+        rc, out, err, expected_rc, _ = xml_validate_result
+        if expected_rc is None:
+            assert rc != 0, fail_msg("validate -f xml on invalid file must fail", rc, out, err)
+        else:
+            assert rc == expected_rc, (
+                fail_msg(f"validate -f xml should exit {expected_rc}", rc, out, err)
+            )
 
-    def test_xml_format_valid_file_contains_testsuite(self):
-        rc, out, err = run_tool(
-            "validate", "-f", "xml", TEST_MODEL / "test_empty.sysml"
-        )
-        self.assertRegex(
-            combined(out, err),
-            r"(?i)<testsuite|testsuite",
-            "Expected <testsuite> element in XML output for valid file",
+    def test_xml_format_report_content(self, xml_validate_result):
+        """<testsuite> for valid files, failure/error elements for invalid ones."""
+        rc, out, err, _, expected_kw = xml_validate_result
+        assert contains_any(combined(out, err), *expected_kw), (
+            f"Expected one of {expected_kw!r} in XML output"
         )
 
-    def test_xml_format_invalid_file_contains_failure(self):
-        rc, out, err = run_tool(
-            "validate", "-f", "xml", TEST_MODEL / "test_syntax_error.sysml"
-        )
-        self.assertNotEqual(rc, 0)
-        self.assertRegex(
-            combined(out, err),
-            r"(?i)<failure|<error|failure|error",
-            "Expected failure/error elements in XML output for invalid file",
-        )
+
+# ---------------------------------------------------------------------------
+
+class TestStdinFile:
+    """--stdin-file: the model comes from stdin, the path need not exist."""
+
+    @pytest.mark.parametrize("source, expected_rc", [
+        ("test_empty.sysml", 0),
+        ("test_syntax_error.sysml", None),
+    ])
+    def test_validate_from_stdin(self, source, expected_rc, tmp_path):
+        virtual = str(tmp_path / "not_on_disk.sysml")
+        content = (TEST_MODEL / source).read_text(encoding="utf-8")
+        rc, out, err = run_tool_oneshot(
+            "--stdin-file", virtual, "validate", virtual, stdin=content,
+        )
+        if expected_rc is None:
+            assert rc != 0, fail_msg(f"invalid {source} via stdin must fail", rc, out, err)
+            assert contains_any(combined(out, err), *KW_SYNTAX_ERROR), (
+                f"Expected an error message for {source} via stdin"
+            )
+        else:
+            assert rc == expected_rc, (
+                fail_msg(f"{source} via stdin should exit {expected_rc}", rc, out, err)
+            )
 
 
 # ---------------------------------------------------------------------------
 
-class TestValidateFolder(unittest.TestCase):
+class TestValidateFolder:
     """validate command on directories (recursive scanning)."""
 
-    def test_test_model_folder_exits_nonzero(self):
+    def test_test_model_folder_exits_nonzero(self, validate_folder_outputs):
         """test_model/ contains invalid files; the folder result must be non-zero."""
-        rc, out, err = run_tool("validate", TEST_MODEL)
-        self.assertNotEqual(
-            rc, 0,
-            fail_msg(
-                "validate test_model/ should fail (contains invalid .sysml files)",
-                rc, out, err,
-            ),
+        rc, out, err = validate_folder_outputs["test_model"]
+        assert rc != 0, fail_msg(
+            "validate test_model/ should fail (contains invalid .sysml files)",
+            rc, out, err,
         )
 
-    def test_test_model_folder_output_mentions_errors(self):
-        rc, out, err = run_tool("validate", TEST_MODEL)
-        self.assertRegex(
-            combined(out, err).lower(),
-            r"error|invalid|fail|syntax",
-            "Expected error keywords in output for test_model/ folder",
+    def test_test_model_folder_output_mentions_errors(self, validate_folder_outputs):
+        rc, out, err = validate_folder_outputs["test_model"]
+        assert contains_any(combined(out, err), *KW_FOLDER_ERROR), (
+            "Expected error keywords in output for test_model/ folder"
         )
 
-    def test_dependency_model_folder_exits_zero(self):
+    def test_dependency_model_folder_exits_zero(self, validate_folder_outputs):
         """dependency_test_model/ should validate cleanly when loaded as a unit."""
-        rc, out, err = run_tool("validate", DEP_MODEL)
-        self.assertEqual(
-            rc, 0,
-            fail_msg(
-                "validate dependency_test_model/ should succeed", rc, out, err
-            ),
+        rc, out, err = validate_folder_outputs["dep_model"]
+        assert rc == 0, fail_msg(
+            "validate dependency_test_model/ should succeed", rc, out, err
         )
 
-    def test_dependency_model_xml_format(self):
+    def test_dependency_model_xml_format(self, validate_folder_outputs):
         """validate -f xml on a valid folder should produce testsuite XML."""
-        rc, out, err = run_tool("validate", "-f", "xml", DEP_MODEL)
-        self.assertEqual(
-            rc, 0,
-            fail_msg("validate -f xml on dep model should exit 0", rc, out, err),
+        rc, out, err = validate_folder_outputs["dep_model_xml"]
+        assert rc == 0, (
+            fail_msg("validate -f xml on dep model should exit 0", rc, out, err)
         )
-        self.assertRegex(
-            combined(out, err),
-            r"(?i)<testsuite|testsuite",
-            "Expected <testsuite> element in XML output",
+        assert contains_any(combined(out, err), *KW_TESTSUITE), (
+            "Expected <testsuite> element in XML output"
         )
 
 
 # ---------------------------------------------------------------------------
 
-class TestViewsCommand(unittest.TestCase):
+class TestViewsCommand:
     """views command — lists ViewDefinition and ViewUsage elements."""
 
     # --- test_views.sysml defines softwareView + hardwareView ---------------
 
-    def test_views_file_exits_zero(self):
-        rc, out, err = run_tool("views", TEST_MODEL / "test_views.sysml")
-        self.assertEqual(
-            rc, 0,
-            fail_msg("views command should succeed on test_views.sysml", rc, out, err),
+    def test_views_file_exits_zero(self, views_test_views_output):
+        rc, out, err = views_test_views_output
+        assert rc == 0, (
+            fail_msg("views command should succeed on test_views.sysml", rc, out, err)
         )
 
-    def test_views_shows_software_view(self):
-        rc, out, err = run_tool("views", TEST_MODEL / "test_views.sysml")
-        self.assertIn(
-            "softwareView",
-            combined(out, err),
-            "Expected 'softwareView' to appear in views output",
+    def test_views_shows_software_view(self, views_test_views_output):
+        rc, out, err = views_test_views_output
+        assert "softwareView" in combined(out, err), (
+            "Expected 'softwareView' to appear in views output"
         )
 
-    def test_views_shows_hardware_view(self):
-        rc, out, err = run_tool("views", TEST_MODEL / "test_views.sysml")
-        self.assertIn(
-            "hardwareView",
-            combined(out, err),
-            "Expected 'hardwareView' to appear in views output",
+    def test_views_shows_hardware_view(self, views_test_views_output):
+        rc, out, err = views_test_views_output
+        assert "hardwareView" in combined(out, err), (
+            "Expected 'hardwareView' to appear in views output"
         )
 
-    def test_views_shows_viewusages_section(self):
-        rc, out, err = run_tool("views", TEST_MODEL / "test_views.sysml")
-        self.assertRegex(
-            combined(out, err),
-            r"(?i)ViewUsage|ViewDefinition",
-            "Expected 'ViewUsages' or 'ViewDefinitions' section header in output",
+    def test_views_shows_viewusages_section(self, views_test_views_output):
+        rc, out, err = views_test_views_output
+        assert contains_any(combined(out, err), *KW_VIEW_SECTION), (
+            "Expected 'ViewUsages' or 'ViewDefinitions' section header in output"
         )
 
-    def test_views_lists_exposed_elements(self):
+    def test_views_lists_exposed_elements(self, views_test_views_output):
         """softwareView exposes sws001/tsc001, hardwareView exposes hws001/tsc001."""
-        rc, out, err = run_tool("views", TEST_MODEL / "test_views.sysml")
-        c = combined(out, err)
-        self.assertRegex(
-            c,
-            r"(?i)expose|sws001|tsc001|hws001",
-            "Expected exposed elements (sws001, tsc001, hws001) in views output",
+        rc, out, err = views_test_views_output
+        assert contains_any(combined(out, err), *KW_EXPOSED), (
+            "Expected exposed elements (sws001, tsc001, hws001) in views output"
         )
 
-    def test_views_no_java_exception(self):
+    def test_views_no_java_exception(self, views_test_views_output):
         """Output must never contain a raw Java stack trace."""
-        rc, out, err = run_tool("views", TEST_MODEL / "test_views.sysml")
-        c = combined(out, err)
-        self.assertNotRegex(
-            c,
-            r"at org\.|at java\.",
-            "Unexpected Java stack trace in views output",
+        rc, out, err = views_test_views_output
+        assert not RE_JAVA_STACK.search(combined(out, err)), (
+            "Unexpected Java stack trace in views output"
         )
 
     # --- dependency_test_model defines softwareSafetyView + hardwareSafetyView
 
-    def test_views_dep_model_folder_exits_zero(self):
-        rc, out, err = run_tool("views", DEP_MODEL)
-        self.assertEqual(
-            rc, 0,
-            fail_msg("views on dependency_test_model/ should succeed", rc, out, err),
+    def test_views_dep_model_folder_exits_zero(self, views_dep_model_output):
+        rc, out, err = views_dep_model_output
+        assert rc == 0, (
+            fail_msg("views on dependency_test_model/ should succeed", rc, out, err)
         )
 
-    def test_views_dep_model_shows_safety_views(self):
-        rc, out, err = run_tool("views", DEP_MODEL)
-        self.assertRegex(
-            combined(out, err),
-            r"(?i)software.*view|hardware.*view|SafetyView|safetyView",
-            "Expected software/hardware safety view names in dep model output",
+    def test_views_dep_model_shows_safety_views(self, views_dep_model_output):
+        rc, out, err = views_dep_model_output
+        assert RE_SAFETY_VIEWS.search(combined(out, err)), (
+            "Expected software/hardware safety view names in dep model output"
         )
 
 
 # ---------------------------------------------------------------------------
 
-class TestDiagramElement(unittest.TestCase):
+class TestDiagramElement:
     """diagram --element / -e option — render a named element."""
 
-    def setUp(self):
-        self.outdir = tempfile.mkdtemp(prefix="sysmltest_elem_")
-
-    def tearDown(self):
-        shutil.rmtree(self.outdir, ignore_errors=True)
-
-    def test_element_batterySystem_exits_zero(self):
+    def test_element_batterySystem_exits_zero(self, outdir):
         rc, out, err = run_tool(
             "diagram", "--element", "batterySystem",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
+            "-o", outdir,
+            TEST_VIEWS_FILE,
         )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --element batterySystem should exit 0", rc, out, err),
+        assert rc == 0, (
+            fail_msg("diagram --element batterySystem should exit 0", rc, out, err)
         )
 
-    def test_element_batterySystem_creates_output_file(self):
-        run_tool(
+    def test_element_batterySystem_creates_output_file(self, outdir):
+        run_tool_rc(
             "diagram", "--element", "batterySystem",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
+            "-o", outdir,
+            TEST_VIEWS_FILE,
         )
-        files = list(Path(self.outdir).rglob("*.*"))
-        self.assertTrue(
-            len(files) > 0,
-            f"Expected at least one output file in {self.outdir} for --element batterySystem",
+        assert any_file(outdir), (
+            f"Expected at least one output file in {outdir} for --element batterySystem"
         )
 
-    def test_element_default_format_is_puml(self):
+    def test_element_default_format_is_puml(self, outdir):
         """Without -f, the default output format is .puml."""
-        run_tool(
+        run_tool_rc(
             "diagram", "--element", "batterySystem",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
+            "-o", outdir,
+            TEST_VIEWS_FILE,
         )
-        puml_files = list(Path(self.outdir).rglob("*.puml"))
-        self.assertTrue(
-            len(puml_files) > 0,
-            f"Expected .puml file(s) in {self.outdir} (default format should be puml)",
+        assert any_file(outdir, ".puml"), (
+            f"Expected .puml file(s) in {outdir} (default format should be puml)"
         )
 
-    def test_element_svg_format(self):
+    def test_element_svg_format(self, outdir):
         rc, out, err = run_tool(
             "diagram", "--element", "batterySystem",
             "-f", "svg",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
+            "-o", outdir,
+            TEST_VIEWS_FILE,
         )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --element -f svg should exit 0", rc, out, err),
+        assert rc == 0, (
+            fail_msg("diagram --element -f svg should exit 0", rc, out, err)
         )
-        svg_files = list(Path(self.outdir).rglob("*.svg"))
-        self.assertTrue(
-            len(svg_files) > 0,
-            f"Expected .svg file(s) in {self.outdir} when -f svg is used",
+        assert any_file(outdir, ".svg"), (
+            f"Expected .svg file(s) in {outdir} when -f svg is used"
         )
 
-    def test_element_short_flag(self):
+    def test_element_short_flag(self, outdir):
         """-e is the short form of --element."""
         rc, out, err = run_tool(
             "diagram", "-e", "batterySystem",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
+            "-o", outdir,
+            TEST_VIEWS_FILE,
         )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram -e batterySystem (short flag) should exit 0", rc, out, err),
+        assert rc == 0, (
+            fail_msg("diagram -e batterySystem (short flag) should exit 0", rc, out, err)
         )
 
 
 # ---------------------------------------------------------------------------
 
-class TestDiagramView(unittest.TestCase):
+class TestDiagramView:
     """diagram --view option — render a named view."""
 
-    def setUp(self):
-        self.outdir = tempfile.mkdtemp(prefix="sysmltest_view_")
-
-    def tearDown(self):
-        shutil.rmtree(self.outdir, ignore_errors=True)
-
-    def test_software_view_exits_zero(self):
-        rc, out, err = run_tool(
-            "diagram", "--view", "softwareView",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
-        )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --view softwareView should exit 0", rc, out, err),
+    def test_software_view_exits_zero(self, diagram_view_outputs):
+        (rc, out, err), _ = diagram_view_outputs["softwareView"]
+        assert rc == 0, (
+            fail_msg("diagram --view softwareView should exit 0", rc, out, err)
         )
 
-    def test_software_view_creates_file(self):
-        run_tool(
-            "diagram", "--view", "softwareView",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
-        )
-        files = list(Path(self.outdir).rglob("*.*"))
-        self.assertTrue(
-            len(files) > 0,
-            f"Expected at least one output file in {self.outdir} for softwareView",
+    def test_software_view_creates_file(self, diagram_view_outputs):
+        _, outdir = diagram_view_outputs["softwareView"]
+        assert any_file(outdir), (
+            f"Expected at least one output file in {outdir} for softwareView"
         )
 
-    def test_hardware_view_exits_zero(self):
-        rc, out, err = run_tool(
-            "diagram", "--view", "hardwareView",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
-        )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --view hardwareView should exit 0", rc, out, err),
+    def test_hardware_view_exits_zero(self, diagram_view_outputs):
+        (rc, out, err), _ = diagram_view_outputs["hardwareView"]
+        assert rc == 0, (
+            fail_msg("diagram --view hardwareView should exit 0", rc, out, err)
         )
 
-    def test_hardware_view_creates_file(self):
-        run_tool(
-            "diagram", "--view", "hardwareView",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
-        )
-        files = list(Path(self.outdir).rglob("*.*"))
-        self.assertTrue(
-            len(files) > 0,
-            f"Expected at least one output file in {self.outdir} for hardwareView",
+    def test_hardware_view_creates_file(self, diagram_view_outputs):
+        _, outdir = diagram_view_outputs["hardwareView"]
+        assert any_file(outdir), (
+            f"Expected at least one output file in {outdir} for hardwareView"
         )
 
-    def test_view_dep_model_software_safety(self):
+    def test_view_dep_model_software_safety(self, diagram_view_outputs):
         """Render softwareSafetyView from the dependency_test_model folder."""
-        rc, out, err = run_tool(
-            "diagram", "--view", "softwareSafetyView",
-            "-o", self.outdir,
-            DEP_MODEL,
-        )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --view softwareSafetyView should exit 0", rc, out, err),
+        (rc, out, err), outdir = diagram_view_outputs["softwareSafetyView"]
+        assert rc == 0, (
+            fail_msg("diagram --view softwareSafetyView should exit 0", rc, out, err)
         )
-        files = list(Path(self.outdir).rglob("*.*"))
-        self.assertTrue(
-            len(files) > 0,
-            f"Expected output file(s) for softwareSafetyView in {self.outdir}",
+        assert any_file(outdir), (
+            f"Expected output file(s) for softwareSafetyView in {outdir}"
         )
 
 
 # ---------------------------------------------------------------------------
 
-class TestDiagramSingle(unittest.TestCase):
+class TestDiagramSingle:
     """diagram --single / -s option — one file per element, mirroring package hierarchy."""
 
-    def setUp(self):
-        self.outdir = tempfile.mkdtemp(prefix="sysmltest_single_")
-
-    def tearDown(self):
-        shutil.rmtree(self.outdir, ignore_errors=True)
-
-    def test_single_exits_zero(self):
+    def test_single_exits_zero(self, outdir):
         rc, out, err = run_tool(
             "diagram", "--single",
-            "-o", self.outdir,
-            DEP_MODEL,
-        )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --single should exit 0", rc, out, err),
+            "-o", outdir,
+            DEP_MODEL_DIR,
         )
+        assert rc == 0, fail_msg("diagram --single should exit 0", rc, out, err)
 
-    def test_single_creates_output_files(self):
-        run_tool("diagram", "--single", "-o", self.outdir, DEP_MODEL)
-        files = list(Path(self.outdir).rglob("*.*"))
-        self.assertTrue(
-            len(files) > 0,
-            f"Expected diagram files in {self.outdir} after --single",
+    def test_single_creates_output_files(self, outdir):
+        run_tool_rc("diagram", "--single", "-o", outdir, DEP_MODEL_DIR)
+        assert any_file(outdir), (
+            f"Expected diagram files in {outdir} after --single"
         )
 
-    def test_single_creates_package_subdirectories(self):
+    def test_single_creates_package_subdirectories(self, outdir):
         """--single must mirror the package hierarchy as subdirectories."""
-        run_tool("diagram", "--single", "-o", self.outdir, DEP_MODEL)
-        subdir_names = {p.name for p in Path(self.outdir).rglob("*") if p.is_dir()}
+        run_tool_rc("diagram", "--single", "-o", outdir, DEP_MODEL_DIR)
+        subdir_names = {d for _, dirs, _ in os.walk(outdir) for d in dirs}
         expected = {"SystemModel", "ProjectRequirements", "Components"}
-        self.assertTrue(
-            subdir_names & expected,
-            f"Expected package subdirs {expected} under output; found: {subdir_names}",
+        assert subdir_names & expected, (
+            f"Expected package subdirs {expected} under output; found: {subdir_names}"
         )
 
-    def test_single_short_flag(self):
+    def test_single_short_flag(self, outdir):
         """-s is the short form of --single."""
         rc, out, err = run_tool(
             "diagram", "-s",
-            "-o", self.outdir,
-            DEP_MODEL,
+            "-o", outdir,
+            DEP_MODEL_DIR,
         )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram -s (short flag) should exit 0", rc, out, err),
+        assert rc == 0, (
+            fail_msg("diagram -s (short flag) should exit 0", rc, out, err)
         )
 
-    def test_single_svg_format(self):
+    def test_single_svg_format(self, outdir):
         rc, out, err = run_tool(
             "diagram", "--single", "-f", "svg",
-            "-o", self.outdir,
-            DEP_MODEL,
+            "-o", outdir,
+            DEP_MODEL_DIR,
         )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --single -f svg should exit 0", rc, out, err),
+        assert rc == 0, (
+            fail_msg("diagram --single -f svg should exit 0", rc, out, err)
         )
-        svg_files = list(Path(self.outdir).rglob("*.svg"))
-        self.assertTrue(
-            len(svg_files) > 0,
-            f"Expected .svg files in {self.outdir} when -f svg is used with --single",
+        assert any_file(outdir, ".svg"), (
+            f"Expected .svg files in {outdir} when -f svg is used with --single"
         )
 
-    def test_single_and_all_elements_are_mutually_exclusive(self):
+    def test_single_and_all_elements_are_mutually_exclusive(self, outdir):
         """--single combined with --all-elements must be rejected (non-zero exit)."""
         rc, out, err = run_tool(
             "diagram", "--single", "--all-elements",
-            "-o", self.outdir,
-            DEP_MODEL,
+            "-o", outdir,
+            DEP_MODEL_DIR,
         )
-        self.assertNotEqual(
-            rc, 0,
-            fail_msg(
-                "--single + --all-elements should be rejected with non-zero exit",
-                rc, out, err,
-            ),
+        assert rc != 0, fail_msg(
+            "--single + --all-elements should be rejected with non-zero exit",
+            rc, out, err,
         )
 
-    def test_single_on_single_file(self):
+    def test_single_on_single_file(self, outdir):
         """--single should also work on a single .sysml file, not just directories."""
         rc, out, err = run_tool(
             "diagram", "--single",
-            "-o", self.outdir,
-            TEST_MODEL / "test_views.sysml",
+            "-o", outdir,
+            TEST_VIEWS_FILE,
         )
-        self.assertEqual(
-            rc, 0,
-            fail_msg("diagram --single on test_views.sysml should exit 0", rc, out, err),
+        assert rc == 0, (
+            fail_msg("diagram --single on test_views.sysml should exit 0", rc, out, err)
         )
-        files = list(Path(self.outdir).rglob("*.*"))
-        self.assertTrue(
-            len(files) > 0,
-            f"Expected output files in {self.outdir} for --single on test_views.sysml",
+        assert any_file(outdir), (
+            f"Expected output files in {outdir} for --single on test_views.sysml"
         )
 
-    def test_single_default_format_is_puml(self):
-        run_tool("diagram", "--single", "-o", self.outdir, DEP_MODEL)
-        puml_files = list(Path(self.outdir).rglob("*.puml"))
-        self.assertTrue(
-            len(puml_files) > 0,
-            f"Expected .puml file(s) in {self.outdir} (default format should be puml)",
+    def test_single_default_format_is_puml(self, outdir):
+        run_tool_rc("diagram", "--single", "-o", outdir, DEP_MODEL_DIR)
+        assert any_file(outdir, ".puml"), (
+            f"Expected .puml file(s) in {outdir} (default format should be puml)"
         )
 
 
 # ---------------------------------------------------------------------------
 
-class TestStructureCommand(unittest.TestCase):
-    """structure command — ASCII tree and JSON outline of dependency_test_model."""
+class TestStructureText:
+    """structure command — ASCII tree of dependency_test_model (default format)."""
 
-    # ── Help ─────────────────────────────────────────────────────────────────
+    @pytest.mark.parametrize("spec", STRUCTURE_TEXT_RUN_SPECS, ids=lambda spec: spec.name)
+    def test_run(self, spec, request):
+        check_exit_code(spec, request)
 
-    def test_help_structure(self):
-        rc, out, err = run_tool("help", "structure")
-        c = combined(out, err)
-        self.assertRegex(c, r"(?i)structure|format|json",
-                         "Expected 'structure' or format options in help output")
-
-    # ── Text format (default) ────────────────────────────────────────────────
-
-    def test_text_format_exits_zero(self):
-        rc, out, err = run_tool("structure", DEP_MODEL)
-        self.assertEqual(rc, 0, fail_msg("structure on dep model should exit 0", rc, out, err))
-
-    def test_text_format_explicit_flag_exits_zero(self):
-        rc, out, err = run_tool("structure", "-f", "text", DEP_MODEL)
-        self.assertEqual(rc, 0, fail_msg("structure -f text should exit 0", rc, out, err))
+    def test_help_structure(self, help_structure_output):
+        rc, out, err = help_structure_output
+        assert contains_any(combined(out, err), *KW_HELP_STRUCTURE), (
+            "Expected 'structure' or format options in help output"
+        )
 
-    def test_text_contains_package_names(self):
-        rc, out, err = run_tool("structure", DEP_MODEL)
+    def test_text_contains_package_names(self, structure_output):
+        rc, out, err = structure_output
         c = combined(out, err)
-        self.assertIn("ProjectRequirements", c,
-                      "Expected 'ProjectRequirements' in structure text output")
-        self.assertIn("SystemModel", c,
-                      "Expected 'SystemModel' in structure text output")
+        assert "ProjectRequirements" in c, "Expected 'ProjectRequirements' in structure text output"
+        assert "SystemModel" in c, "Expected 'SystemModel' in structure text output"
 
-    def test_text_contains_requirement_names(self):
-        rc, out, err = run_tool("structure", DEP_MODEL)
+    def test_text_contains_requirement_names(self, structure_output):
+        rc, out, err = structure_output
         c = combined(out, err)
         for name in ("SafetyRequirement", "FSC001", "TSC001", "SWS001", "HWS001"):
-            self.assertIn(name, c,
-                          f"Expected requirement '{name}' in structure text output")
+            assert name in c, f"Expected requirement '{name}' in structure text output"
 
-    def test_text_contains_part_definition(self):
-        rc, out, err = run_tool("structure", DEP_MODEL)
-        self.assertIn("BatteryControllerDefinition", combined(out, err),
-                      "Expected 'BatteryControllerDefinition' in structure text output")
+    def test_text_contains_part_definition(self, structure_output):
+        rc, out, err = structure_output
+        assert "BatteryControllerDefinition" in combined(out, err), (
+            "Expected 'BatteryControllerDefinition' in structure text output"
+        )
 
-    def test_text_shows_metatype_brackets(self):
+    def test_text_shows_metatype_brackets(self, structure_output):
         """Element lines must include the metatype in square brackets, e.g. [Package]."""
-        rc, out, err = run_tool("structure", DEP_MODEL)
-        self.assertRegex(combined(out, err), r"\[Package\]",
-                         "Expected '[Package]' metatype label in structure text output")
+        rc, out, err = structure_output
+        assert PACKAGE_LABEL in combined(out, err), (
+            "Expected '[Package]' metatype label in structure text output"
+        )
 
-    def test_text_shows_tree_connectors(self):
+    def test_text_shows_tree_connectors(self, structure_output):
         """Child elements must appear prefixed/indented, never at column 0.
 
         FSC001 is always nested inside FunctionalSafetyConcept [Package], so
@@ -667,287 +989,338 @@ class TestStructureCommand(unittest.TestCase):
         This check is intentionally encoding-agnostic: it asserts structural
         indentation rather than specific Unicode codepoints.
         """
-        rc, out, err = run_tool("structure", DEP_MODEL)
+        rc, out, err = structure_output
         lines = combined(out, err).splitlines()
         fsc_lines = [l for l in lines if "FSC001" in l]
-        self.assertTrue(fsc_lines, "FSC001 not found in structure output at all")
-        self.assertTrue(
-            all(not l.startswith("FSC001") for l in fsc_lines),
+        assert fsc_lines, "FSC001 not found in structure output at all"
+        assert all(not l.startswith("FSC001") for l in fsc_lines), (
             "Expected every FSC001 line to be tree-indented (not starting at column 0); "
-            f"got: {fsc_lines}",
+            f"got: {fsc_lines}"
         )
 
-    def test_text_shows_relations_section(self):
-        rc, out, err = run_tool("structure", DEP_MODEL)
-        self.assertIn("Relations:", combined(out, err),
-                      "Expected 'Relations:' section header in structure text output")
+    def test_text_shows_relations_section(self, structure_output):
+        rc, out, err = structure_output
+        assert "Relations:" in combined(out, err), (
+            "Expected 'Relations:' section header in structure text output"
+        )
 
-    def test_text_shows_dependency_relations(self):
+    def test_text_shows_dependency_relations(self, structure_output):
         """dependency derivation statements must produce 'dependency' relation entries."""
-        rc, out, err = run_tool("structure", DEP_MODEL)
-        self.assertIn("dependency", combined(out, err),
-                      "Expected 'dependency' kind in relations section")
+        rc, out, err = structure_output
+        assert "dependency" in combined(out, err), "Expected 'dependency' kind in relations section"
 
-    def test_text_dependency_source_and_target(self):
+    def test_text_dependency_source_and_target(self, structure_output):
         """TSC001 -[dependency]-> FSC001 must appear (derivation from TSC001 to FSC001)."""
-        rc, out, err = run_tool("structure", DEP_MODEL)
+        rc, out, err = structure_output
         c = combined(out, err)
         # Both endpoints must be present somewhere in the relations block
-        self.assertRegex(c, r"TSC001.*dependency|dependency.*TSC001",
-                         "Expected TSC001 to appear near 'dependency' in relations")
-        self.assertRegex(c, r"FSC001.*dependency|dependency.*FSC001|TSC001.*FSC001",
-                         "Expected FSC001 to appear as a dependency target")
+        assert RE_TSC001_DEPENDENCY.search(c), (
+            "Expected TSC001 to appear near 'dependency' in relations"
+        )
+        assert RE_FSC001_DEPENDENCY.search(c), "Expected FSC001 to appear as a dependency target"
 
-    def test_text_shows_satisfy_relations(self):
+    def test_text_shows_satisfy_relations(self, structure_output):
         """satisfy clauses inside BatteryControllerDefinition must appear in relations."""
-        rc, out, err = run_tool("structure", DEP_MODEL)
-        self.assertIn("satisfy", combined(out, err),
-                      "Expected 'satisfy' kind in relations section")
+        rc, out, err = structure_output
+        assert "satisfy" in combined(out, err), "Expected 'satisfy' kind in relations section"
 
-    def test_text_satisfy_links_fsc001_and_tsc001(self):
-        rc, out, err = run_tool("structure", DEP_MODEL)
+    def test_text_satisfy_links_fsc001_and_tsc001(self, structure_output):
+        rc, out, err = structure_output
         c = combined(out, err)
-        self.assertRegex(c, r"satisfy.*FSC001|FSC001.*satisfy",
-                         "Expected FSC001 to appear as a satisfy target")
-        self.assertRegex(c, r"satisfy.*TSC001|TSC001.*satisfy",
-                         "Expected TSC001 to appear as a satisfy target")
-
-    def test_text_no_java_exception(self):
-        rc, out, err = run_tool("structure", DEP_MODEL)
-        self.assertNotRegex(combined(out, err), r"at org\.|at java\.",
-                            "Unexpected Java stack trace in structure output")
-
-    def test_text_single_file_exits_zero(self):
-        """structure should work on a single .sysml file as well as a directory."""
-        rc, out, err = run_tool(
-            "structure", DEP_MODEL / "req" / "requirements.sysml"
-        )
-        self.assertEqual(rc, 0,
-                         fail_msg("structure on single .sysml file should exit 0", rc, out, err))
+        assert RE_FSC001_SATISFY.search(c), "Expected FSC001 to appear as a satisfy target"
+        assert RE_TSC001_SATISFY.search(c), "Expected TSC001 to appear as a satisfy target"
 
-    def test_text_single_file_contains_requirement_names(self):
-        rc, out, err = run_tool(
-            "structure", DEP_MODEL / "req" / "requirements.sysml"
+    def test_text_no_java_exception(self, structure_output):
+        rc, out, err = structure_output
+        assert not RE_JAVA_STACK.search(combined(out, err)), (
+            "Unexpected Java stack trace in structure output"
         )
+
+    def test_text_single_file_contains_requirement_names(self, structure_single_file_output):
+        rc, out, err = structure_single_file_output
         c = combined(out, err)
-        self.assertIn("FSC001", c, "Expected 'FSC001' in single-file structure output")
-        self.assertIn("TSC001", c, "Expected 'TSC001' in single-file structure output")
+        assert "FSC001" in c, "Expected 'FSC001' in single-file structure output"
+        assert "TSC001" in c, "Expected 'TSC001' in single-file structure output"
+
 
-    # ── JSON format ──────────────────────────────────────────────────────────
+# ---------------------------------------------------------------------------
 
-    def test_json_format_exits_zero(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
-        self.assertEqual(rc, 0, fail_msg("structure -f json should exit 0", rc, out, err))
+class TestStructureJson:
+    """structure -f json — JSON outline of dependency_test_model."""
 
-    def test_json_output_is_valid_json(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    @pytest.mark.parametrize("spec", STRUCTURE_JSON_RUN_SPECS, ids=lambda spec: spec.name)
+    def test_run(self, spec, request):
+        check_exit_code(spec, request)
+
+    def test_json_output_is_valid_json(self, structure_json_output):
+        rc, out, err = structure_json_output
         try:
             json.loads(out)
         except json.JSONDecodeError as e:
-            self.fail(f"structure -f json produced invalid JSON: {e}\nstdout: {out[:400]}")
+            pytest.fail(f"structure -f json produced invalid JSON: {e}\nstdout: {out[:400]}")
 
-    def test_json_has_structure_key(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_has_structure_key(self, structure_json_output):
+        rc, out, err = structure_json_output
         data = json.loads(out)
-        self.assertIn("structure", data, "JSON output must contain top-level 'structure' key")
+        assert "structure" in data, "JSON output must contain top-level 'structure' key"
 
-    def test_json_has_relations_key(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_has_relations_key(self, structure_json_output):
+        rc, out, err = structure_json_output
         data = json.loads(out)
-        self.assertIn("relations", data, "JSON output must contain top-level 'relations' key")
+        assert "relations" in data, "JSON output must contain top-level 'relations' key"
 
-    def test_json_structure_is_array(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_structure_is_array(self, structure_json_output):
+        rc, out, err = structure_json_output
         data = json.loads(out)
-        self.assertIsInstance(data["structure"], list,
-                              "'structure' value must be a JSON array")
+        assert isinstance(data["structure"], list), "'structure' value must be a JSON array"
 
-    def test_json_relations_is_array(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_relations_is_array(self, structure_json_output):
+        rc, out, err = structure_json_output
         data = json.loads(out)
-        self.assertIsInstance(data["relations"], list,
-                              "'relations' value must be a JSON array")
+        assert isinstance(data["relations"], list), "'relations' value must be a JSON array"
 
-    def test_json_structure_contains_package_names(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_structure_contains_package_names(self, structure_json_output):
+        rc, out, err = structure_json_output
         text = out  # search raw JSON text for names (avoids deep traversal)
-        self.assertIn("ProjectRequirements", text,
-                      "Expected 'ProjectRequirements' in JSON structure output")
-        self.assertIn("SystemModel", text,
-                      "Expected 'SystemModel' in JSON structure output")
+        assert "ProjectRequirements" in text, "Expected 'ProjectRequirements' in JSON structure output"
+        assert "SystemModel" in text, "Expected 'SystemModel' in JSON structure output"
 
-    def test_json_structure_contains_requirement_names(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_structure_contains_requirement_names(self, structure_json_output):
+        rc, out, err = structure_json_output
         text = out
         for name in ("FSC001", "TSC001", "SWS001", "HWS001"):
-            self.assertIn(name, text,
-                          f"Expected '{name}' in JSON structure output")
+            assert name in text, f"Expected '{name}' in JSON structure output"
 
-    def test_json_relations_contain_dependency_entries(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_relations_contain_dependency_entries(self, structure_json_output):
+        rc, out, err = structure_json_output
         data = json.loads(out)
         kinds = [r.get("kind") for r in data["relations"]]
-        self.assertIn("dependency", kinds,
-                      "Expected at least one 'dependency' entry in JSON relations")
+        assert "dependency" in kinds, "Expected at least one 'dependency' entry in JSON relations"
 
-    def test_json_relations_contain_satisfy_entries(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_relations_contain_satisfy_entries(self, structure_json_output):
+        rc, out, err = structure_json_output
         data = json.loads(out)
         kinds = [r.get("kind") for r in data["relations"]]
-        self.assertIn("satisfy", kinds,
-                      "Expected at least one 'satisfy' entry in JSON relations")
+        assert "satisfy" in kinds, "Expected at least one 'satisfy' entry in JSON relations"
 
-    def test_json_relation_objects_have_required_keys(self):
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+    def test_json_relation_objects_have_required_keys(self, structure_json_output):
+        rc, out, err = structure_json_output
         data = json.loads(out)
         for rel in data["relations"]:
             for key in ("kind", "from", "to"):
-                self.assertIn(key, rel,
-                              f"Each relation object must have a '{key}' key; got: {rel}")
+                assert key in rel, f"Each relation object must have a '{key}' key; got: {rel}"
 
-    def test_json_dependency_relation_endpoints(self):
+    def test_json_dependency_relation_endpoints(self, structure_json_output):
         """TSC001 → FSC001 dependency must appear as a JSON relation object."""
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+        rc, out, err = structure_json_output
         data = json.loads(out)
         deps = [r for r in data["relations"] if r.get("kind") == "dependency"]
         froms = {r.get("from") for r in deps}
         tos   = {r.get("to")   for r in deps}
-        self.assertIn("TSC001", froms,
-                      f"Expected 'TSC001' as dependency source; sources found: {froms}")
-        self.assertIn("FSC001", tos,
-                      f"Expected 'FSC001' as dependency target; targets found: {tos}")
+        assert "TSC001" in froms, f"Expected 'TSC001' as dependency source; sources found: {froms}"
+        assert "FSC001" in tos, f"Expected 'FSC001' as dependency target; targets found: {tos}"
 
-    def test_json_satisfy_relation_endpoints(self):
+    def test_json_satisfy_relation_endpoints(self, structure_json_output):
         """BatteryControllerDefinition satisfy → FSC001/TSC001 must appear in JSON."""
-        rc, out, err = run_tool("structure", "-f", "json", DEP_MODEL)
+        rc, out, err = structure_json_output
         data = json.loads(out)
         satisfies = [r for r in data["relations"] if r.get("kind") == "satisfy"]
         tos = {r.get("to") for r in satisfies}
-        self.assertTrue(
-            tos & {"FSC001", "TSC001"},
-            f"Expected FSC001 or TSC001 as satisfy target; targets found: {tos}",
+        assert tos & {"FSC001", "TSC001"}, (
+            f"Expected FSC001 or TSC001 as satisfy target; targets found: {tos}"
         )
 
-    # ── --relations flag (text) ───────────────────────────────────────────────
 
-    def test_relations_flag_exits_zero(self):
-        rc, out, err = run_tool("structure", "--relations", DEP_MODEL)
-        self.assertEqual(rc, 0,
-                         fail_msg("structure --relations should exit 0", rc, out, err))
+# ---------------------------------------------------------------------------
+
+class TestStructureRelations:
+    """structure --relations — relations only, as text and as JSON."""
+
+    @pytest.mark.parametrize("spec", STRUCTURE_RELATIONS_RUN_SPECS, ids=lambda spec: spec.name)
+    def test_run(self, spec, request):
+        check_exit_code(spec, request)
+
+    # --- Text -----------------------------------------------------------------
 
-    def test_relations_flag_shows_relations_header(self):
-        rc, out, err = run_tool("structure", "--relations", DEP_MODEL)
-        self.assertIn("Relations:", combined(out, err),
-                      "Expected 'Relations:' header with --relations flag")
+    def test_relations_flag_shows_relations_header(self, structure_relations_output):
+        rc, out, err = structure_relations_output
+        assert "Relations:" in combined(out, err), "Expected 'Relations:' header with --relations flag"
 
-    def test_relations_flag_shows_dependency_entries(self):
-        rc, out, err = run_tool("structure", "--relations", DEP_MODEL)
-        self.assertIn("dependency", combined(out, err),
-                      "Expected 'dependency' entries with --relations flag")
+    def test_relations_flag_shows_dependency_entries(self, structure_relations_output):
+        rc, out, err = structure_relations_output
+        assert "dependency" in combined(out, err), (
+            "Expected 'dependency' entries with --relations flag"
+        )
 
-    def test_relations_flag_shows_satisfy_entries(self):
-        rc, out, err = run_tool("structure", "--relations", DEP_MODEL)
-        self.assertIn("satisfy", combined(out, err),
-                      "Expected 'satisfy' entries with --relations flag")
+    def test_relations_flag_shows_satisfy_entries(self, structure_relations_output):
+        rc, out, err = structure_relations_output
+        assert "satisfy" in combined(out, err), "Expected 'satisfy' entries with --relations flag"
 
-    def test_relations_flag_omits_element_tree(self):
+    def test_relations_flag_omits_element_tree(self, structure_relations_output):
         """--relations must suppress the element tree; no [Package] labels."""
-        rc, out, err = run_tool("structure", "--relations", DEP_MODEL)
-        self.assertNotRegex(combined(out, err), r"\[Package\]",
-                            "--relations output must not contain the element tree")
+        rc, out, err = structure_relations_output
+        assert PACKAGE_LABEL not in combined(out, err), (
+            "--relations output must not contain the element tree"
+        )
 
-    def test_relations_flag_omits_package_names_from_tree(self):
+    def test_relations_flag_omits_package_names_from_tree(self, structure_relations_output):
         """Package names must not appear as tree nodes (they can still appear in relation endpoints)."""
-        rc, out, err = run_tool("structure", "--relations", DEP_MODEL)
+        rc, out, err = structure_relations_output
         c = combined(out, err)
         # The tree prints "PackageName [TypeName]"; that pattern must be absent
-        self.assertNotRegex(c, r"ProjectRequirements\s+\[",
-                            "--relations must not print 'ProjectRequirements [...]' tree node")
-        self.assertNotRegex(c, r"SystemModel\s+\[",
-                            "--relations must not print 'SystemModel [...]' tree node")
+        assert not RE_PROJECT_REQUIREMENTS_NODE.search(c), (
+            "--relations must not print 'ProjectRequirements [...]' tree node"
+        )
+        assert not RE_SYSTEM_MODEL_NODE.search(c), (
+            "--relations must not print 'SystemModel [...]' tree node"
+        )
 
-    def test_relations_flag_combined_with_explicit_text_format(self):
+    def test_relations_flag_combined_with_explicit_text_format(
+            self, structure_relations_output, structure_relations_text_output):
         """-f text --relations and --relations alone must produce identical output."""
-        rc1, out1, err1 = run_tool("structure", "--relations", DEP_MODEL)
-        rc2, out2, err2 = run_tool("structure", "--relations", "-f", "text", DEP_MODEL)
-        self.assertEqual(rc1, 0)
-        self.assertEqual(rc2, 0)
-        self.assertEqual(out1.strip(), out2.strip(),
-                         "--relations and --relations -f text must produce the same output")
-
-    # ── --relations flag (JSON) ───────────────────────────────────────────────
-
-    def test_relations_flag_json_exits_zero(self):
-        rc, out, err = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
-        self.assertEqual(rc, 0,
-                         fail_msg("structure --relations -f json should exit 0", rc, out, err))
-
-    def test_relations_flag_json_is_valid_json(self):
-        rc, out, err = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
+        rc1, out1, err1 = structure_relations_output
+        rc2, out2, err2 = structure_relations_text_output
+        assert rc1 == 0
+        assert rc2 == 0
+        assert out1.strip() == out2.strip(), (
+            "--relations and --relations -f text must produce the same output"
+        )
+
+    # --- JSON -----------------------------------------------------------------
+
+    def test_relations_flag_json_is_valid_json(self, structure_relations_json_output):
+        rc, out, err = structure_relations_json_output
         try:
             json.loads(out)
         except json.JSONDecodeError as e:
-            self.fail(f"structure --relations -f json produced invalid JSON: {e}\n"
-                      f"stdout: {out[:400]}")
+            pytest.fail(f"structure --relations -f json produced invalid JSON: {e}\n"
+                        f"stdout: {out[:400]}")
 
-    def test_relations_flag_json_has_relations_key(self):
-        rc, out, err = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
+    def test_relations_flag_json_has_relations_key(self, structure_relations_json_output):
+        rc, out, err = structure_relations_json_output
         data = json.loads(out)
-        self.assertIn("relations", data,
-                      "--relations JSON must contain 'relations' key")
+        assert "relations" in data, "--relations JSON must contain 'relations' key"
 
-    def test_relations_flag_json_omits_structure_key(self):
+    def test_relations_flag_json_omits_structure_key(self, structure_relations_json_output):
         """--relations JSON must NOT contain the 'structure' key."""
-        rc, out, err = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
+        rc, out, err = structure_relations_json_output
         data = json.loads(out)
-        self.assertNotIn("structure", data,
-                         "--relations JSON must omit the 'structure' key")
+        assert "structure" not in data, "--relations JSON must omit the 'structure' key"
 
-    def test_relations_flag_json_relations_is_array(self):
-        rc, out, err = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
+    def test_relations_flag_json_relations_is_array(self, structure_relations_json_output):
+        rc, out, err = structure_relations_json_output
         data = json.loads(out)
-        self.assertIsInstance(data["relations"], list,
-                              "'relations' in --relations JSON must be an array")
+        assert isinstance(data["relations"], list), (
+            "'relations' in --relations JSON must be an array"
+        )
 
-    def test_relations_flag_json_contains_dependency(self):
-        rc, out, err = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
+    def test_relations_flag_json_contains_dependency(self, structure_relations_json_output):
+        rc, out, err = structure_relations_json_output
         data = json.loads(out)
         kinds = [r.get("kind") for r in data["relations"]]
-        self.assertIn("dependency", kinds,
-                      "Expected 'dependency' entries in --relations JSON")
+        assert "dependency" in kinds, "Expected 'dependency' entries in --relations JSON"
 
-    def test_relations_flag_json_contains_satisfy(self):
-        rc, out, err = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
+    def test_relations_flag_json_contains_satisfy(self, structure_relations_json_output):
+        rc, out, err = structure_relations_json_output
         data = json.loads(out)
         kinds = [r.get("kind") for r in data["relations"]]
-        self.assertIn("satisfy", kinds,
-                      "Expected 'satisfy' entries in --relations JSON")
+        assert "satisfy" in kinds, "Expected 'satisfy' entries in --relations JSON"
 
-    def test_relations_flag_json_matches_full_relations(self):
+    def test_relations_flag_json_matches_full_relations(
+            self, structure_relations_json_output, structure_json_output):
         """relations from --relations -f json must equal the relations from the full output."""
-        rc1, out1, _ = run_tool("structure", "--relations", "-f", "json", DEP_MODEL)
-        rc2, out2, _ = run_tool("structure", "-f", "json", DEP_MODEL)
-        self.assertEqual(rc1, 0)
-        self.assertEqual(rc2, 0)
+        rc1, out1, _ = structure_relations_json_output
+        rc2, out2, _ = structure_json_output
+        assert rc1 == 0
+        assert rc2 == 0
         rels_only  = json.loads(out1)["relations"]
         rels_full  = json.loads(out2)["relations"]
-        self.assertEqual(
-            sorted(rels_only,  key=lambda r: (r["kind"], r["from"], r["to"])),
-            sorted(rels_full,  key=lambda r: (r["kind"], r["from"], r["to"])),
-            "--relations relations must be identical to those in the full structure output",
-        )
+        assert (
+            sorted(rels_only,  key=lambda r: (r["kind"], r["from"], r["to"]))
+            == sorted(rels_full,  key=lambda r: (r["kind"], r["from"], r["to"]))
+        ), "--relations relations must be identical to those in the full structure output"
+
+
+# ---------------------------------------------------------------------------
+# Daemon
+#
+# The suite normally runs every invocation in the shared --daemon JVM; these
+# tests pin it to the behaviour of the real CLI and check the client side of
+# its protocol against a stub daemon.
+# ---------------------------------------------------------------------------
+
+class TestDaemonMatchesOneShot:
+    """The daemon must answer exactly like a ``java -jar`` process per command."""
+
+    @pytest.mark.parametrize("key", [
+        "help_validate",
+        "validate_empty",
+        "validate_syntax_error",
+        "validate_views",
+        "validate_dep_model",
+        "structure_json",
+        "structure_missing_path",
+    ])
+    def test_same_result(self, key):
+        daemon = shared_daemon()
+        if daemon is None:
+            pytest.skip("daemon disabled (SYSML_NO_DAEMON=1) or unavailable")
+        args = _FROZEN_ARGS[key]
+        via_daemon = daemon.send(args, cwd=PROJECT_ROOT)
+        assert via_daemon is not None, "daemon did not answer"
+        assert via_daemon == run_tool_oneshot(*args), (
+            f"daemon and one-shot run of {args} differ"
+        )
+
+
+# Stands in for ``java -jar … --daemon``: prints a stray line first (like a
+# JVM warning), then answers each request after another unprefixed line.
+# ID_OFFSET != 0 makes it echo wrong ids.
+_STUB_DAEMON = """\
+import json, sys
+print("[warning][cds] stray JVM output", flush=True)
+for line in sys.stdin:
+    request = json.loads(line)
+    reply = {"id": request["id"] + ID_OFFSET, "rc": 3,
+             "out": " ".join(request["args"]), "err": "stub"}
+    print("not a reply")
+    print("@sysml-daemon " + json.dumps(reply), flush=True)
+"""
+
+
+@pytest.fixture
+def stub_daemon(tmp_path, request):
+    """JvmDaemon client connected to _STUB_DAEMON; param is the id offset."""
+    script = tmp_path / "stub_daemon.py"
+    script.write_text(_STUB_DAEMON.replace("ID_OFFSET", str(request.param)), encoding="utf-8")
+    daemon = JvmDaemon(PROJECT_ROOT, command=[sys.executable, str(script)], name="stub-daemon")
+    yield daemon
+    daemon.close()
+
+
+class TestDaemonProtocol:
+    """Client side of the daemon protocol (tool_runner.JvmDaemon)."""
 
-    # ── Error handling ────────────────────────────────────────────────────────
+    @pytest.mark.parametrize("stub_daemon", [0], indirect=True)
+    def test_skips_lines_without_prefix(self, stub_daemon):
+        assert stub_daemon.send(["help", "validate"]) == (3, "help validate", "stub")
+        assert stub_daemon.send(["help", "views"]) == (3, "help views", "stub")
+        assert stub_daemon.alive
 
-    def test_unknown_format_rejected(self):
-        rc, out, err = run_tool("structure", "-f", "xml", DEP_MODEL)
-        self.assertNotEqual(rc, 0,
-                            "structure -f xml (unknown format) should exit non-zero")
+    @pytest.mark.parametrize("stub_daemon", [1], indirect=True)
+    def test_id_mismatch_abandons_daemon(self, stub_daemon):
+        assert stub_daemon.send(["help", "validate"]) is None
+        assert not stub_daemon.alive
+        assert stub_daemon.send(["help", "views"]) is None
 
-    def test_missing_path_rejected(self):
-        rc, out, err = run_tool("structure", "/nonexistent/path.sysml")
-        self.assertNotEqual(rc, 0,
-                            "structure on a non-existent path should exit non-zero")
+    @pytest.mark.parametrize("stub_daemon", [1], indirect=True)
+    def test_run_tool_falls_back_to_one_shot(self, stub_daemon, monkeypatch):
+        monkeypatch.setattr(sys.modules[__name__], "shared_daemon", lambda: stub_daemon)
+        monkeypatch.setenv("SYSML_NO_RUNCACHE", "1")
+        rc, out, err = run_tool(*_FROZEN_ARGS["version_long"])
+        assert not stub_daemon.alive
+        assert rc == 0, fail_msg("--version should exit 0 after falling back", rc, out, err)
+        assert RE_VERSION.search(combined(out, err))
 
 
 # ---------------------------------------------------------------------------
@@ -955,19 +1328,6 @@ class TestStructureCommand(unittest.TestCase):
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    # Pre-flight checks
-    errors = []
-    if not JAR.exists():
-        errors.append(
-            f"JAR not found: {JAR}\n"
-            "  Build with: cd src && mvn compile package"
-        )
-    if shutil.which("java") is None:
-        errors.append("'java' not found on PATH")
-
-    if errors:
-        for e in errors:
-            print(f"ERROR: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    unittest.main(verbosity=2)
+    # Pre-flight checks (JAR, java) run once in conftest.pytest_configure.
+    # The suites are plain pytest classes fed by fixtures, so run via pytest.
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,409 @@
+"""
+Running sysmlv2-tool from the regression suite.
+
+``java_command`` builds the command line for one-shot ``java -jar`` runs.
+Every JVM started this way maps a dynamic AppCDS archive
+(test/.jvm-cache/app.jsa, JEP 350) so that class loading and verification of
+the Xtext/EMF stack is not repeated per process. ``ensure_cds_archive`` dumps
+it and rebuilds it whenever the JAR or the JVM changes; set SYSML_NO_CDS=1 to
+disable it.
+
+``shared_daemon`` returns one long-lived ``java -jar … --daemon`` process per
+test process (``JvmDaemon``), so the suite pays JVM startup once per session
+(per xdist worker) instead of once per test; with SYSML_DAEMON_STDIN=1 single
+model files are read once and handed to it via --stdin-file. Set
+SYSML_NO_DAEMON=1 to run every invocation as a separate process again.
+
+``disk_cached`` memoizes results of read-only tool invocations on disk
+(test/.runcache/), keyed by the JAR and the inputs they read, so unchanged
+tests are ~free on reruns. Set SYSML_NO_RUNCACHE=1 to bypass the cache.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+JAR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..",
+    "src", "sysmlv2-tool-assembly", "target", "sysmlv2-tool-fat.jar",
+))
+_PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+
+# Resolve java once. Exporting the absolute path lets xdist workers (which
+# re-import this module) skip the PATH walk; setting SYSML_JAVA_BIN up front
+# also selects a specific JVM for the suite.
+JAVA = os.environ.get("SYSML_JAVA_BIN") or shutil.which("java")
+if JAVA:
+    os.environ["SYSML_JAVA_BIN"] = JAVA
+_CDS_ARCHIVE = Path(__file__).parent / ".jvm-cache" / "app.jsa"
+_CDS_STAMP = _CDS_ARCHIVE.with_name("app.jsa.stamp")
+_RUN_CACHE = Path(__file__).parent / ".runcache"
+_DAEMON_LOG_DIR = _CDS_ARCHIVE.parent
+_DAEMON_REPLY_PREFIX = "@sysml-daemon "  # ToolDaemon.REPLY_PREFIX
+
+# Each one-shot run finishes in seconds, so C2 compilation never pays off and
+# the serial collector has the cheapest startup. Override with SYSML_JAVA_OPTS
+# (an empty value restores the JVM defaults).
+_DEFAULT_JAVA_OPTS = "-XX:TieredStopAtLevel=1 -XX:+UseSerialGC"
+_RUN_CACHE_MAX_ENTRIES = 500
+
+
+def _cds_enabled():
+    return os.environ.get("SYSML_NO_CDS") != "1"
+
+
+@functools.lru_cache(maxsize=None)
+def _java_identity():
+    """(resolved path, mtime_ns, size) of the java binary, or None."""
+    try:
+        java = os.path.realpath(JAVA)
+        st = os.stat(java)
+    except (OSError, TypeError):
+        return None
+    return java, st.st_mtime_ns, st.st_size
+
+
+def _cds_stamp():
+    """Identify the JVM binary and JAR that an archive is dumped for.
+
+    A dynamic archive only maps into the exact JVM and classpath that wrote
+    it, so the stamp changes with SYSML_JAVA_BIN, a JDK upgrade or a rebuild.
+    """
+    java = _java_identity()
+    try:
+        jar_st = os.stat(JAR)
+    except OSError:
+        return None
+    if java is None:
+        return None
+    return json.dumps([*java, jar_st.st_mtime_ns, jar_st.st_size])
+
+
+def _cds_archive_current():
+    """True if the archive exists and was dumped by the current JVM and JAR."""
+    try:
+        recorded = _CDS_STAMP.read_text(encoding="utf-8")
+    except OSError:
+        return False
+    return _CDS_ARCHIVE.exists() and recorded == _cds_stamp()
+
+
+def ensure_cds_archive():
+    """Dump the AppCDS archive unless an up-to-date one already exists.
+
+    The archive is recorded from a real ``validate`` run rather than
+    ``--version`` so that it covers the Xtext/EMF classes every test loads.
+    It is stamped with the JVM and JAR it belongs to (app.jsa.stamp) and
+    redumped when either changes. A failed dump (e.g. a JVM without
+    -XX:ArchiveClassesAtExit) leaves no archive behind and the suite simply
+    runs without CDS.
+    """
+    if not _cds_enabled() or _cds_archive_current():
+        return
+    _CDS_ARCHIVE.parent.mkdir(exist_ok=True)
+    _CDS_ARCHIVE.unlink(missing_ok=True)
+    _CDS_STAMP.unlink(missing_ok=True)
+    subprocess.run(
+        [
+            JAVA, f"-XX:ArchiveClassesAtExit={_CDS_ARCHIVE}",
+            "-jar", JAR,
+            "validate", str(_PROJECT_ROOT / "test" / "test_model" / "test_empty.sysml"),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=str(_PROJECT_ROOT),
+    )
+    stamp = _cds_stamp()
+    if _CDS_ARCHIVE.exists() and stamp is not None:
+        _CDS_STAMP.write_text(stamp, encoding="utf-8")
+
+
+def java_command(*args, long_lived=False):
+    """Build the ``java … -jar JAR <args>`` command line used by the suite.
+
+    ``long_lived`` is set for the daemon, which serves the whole session and
+    keeps the C2 compiler so that later requests run at full speed.
+    """
+    options = shlex.split(os.environ.get("SYSML_JAVA_OPTS", _DEFAULT_JAVA_OPTS))
+    if long_lived:
+        options = [o for o in options if not o.startswith("-XX:TieredStopAtLevel")]
+    # Pin the console encoding so output decodes the same regardless of locale.
+    options += ["-Dstdout.encoding=UTF-8", "-Dstderr.encoding=UTF-8"]
+    if _cds_enabled() and _cds_archive_current():
+        # -Xshare:auto silently falls back to no sharing if the archive does
+        # not match this JVM or JAR instead of refusing to start.
+        options += [f"-XX:SharedArchiveFile={_CDS_ARCHIVE}", "-Xshare:auto"]
+    return [JAVA or "java", *options, "-jar", JAR, *(str(a) for a in args)]
+
+
+def _input_stats(arg):
+    """(path, mtime_ns, size) for every file an argument may make the tool read."""
+    path = _PROJECT_ROOT / str(arg)
+    if path.is_file():
+        st = path.stat()
+        return [(str(path), st.st_mtime_ns, st.st_size)]
+    stats = []
+    if path.is_dir():
+        for dirpath, _dirs, files in os.walk(path):
+            for name in files:
+                st = os.stat(os.path.join(dirpath, name))
+                stats.append((os.path.join(dirpath, name), st.st_mtime_ns, st.st_size))
+    return stats
+
+
+@functools.lru_cache(maxsize=None)
+def _library_stats():
+    """_input_stats() of the standard library the tool will load, if any.
+
+    Mirrors SysMLEngineHelper.autoDetectLibrary for the suite's working
+    directory (PROJECT_ROOT): $SYSML_LIBRARY first, then the submodule paths.
+    """
+    candidates = []
+    env = os.environ.get("SYSML_LIBRARY")
+    if env and os.path.isdir(env):
+        candidates.append(env)
+    candidates += [
+        os.path.join(_PROJECT_ROOT, rel, "SysML-v2-Release", "sysml.library")
+        for rel in ("src/submodules", "submodules", "../submodules", "../../submodules")
+    ]
+    home = os.path.expanduser("~")
+    candidates += [
+        os.path.join(home, rel, "SysML-v2-Release", "sysml.library")
+        for rel in ("../submodules", "../../submodules")
+    ]
+    for path in candidates:
+        if os.path.exists(os.path.join(path, "Systems Library", "SysML.sysml")):
+            return sorted(_input_stats(os.path.abspath(path)))
+    return []
+
+
+def _run_cache_key(args):
+    jar = os.stat(JAR)
+    inputs = sorted(s for a in args for s in _input_stats(a))
+    environment = [
+        # How the result is produced, so e.g. SYSML_NO_DAEMON=1 never reuses
+        # a result the daemon produced.
+        [os.environ.get(name) == "1"
+         for name in ("SYSML_NO_DAEMON", "SYSML_NO_CDS", "SYSML_DAEMON_STDIN")],
+        _java_identity(),
+        os.environ.get("SYSML_JAVA_OPTS", _DEFAULT_JAVA_OPTS),
+        os.environ.get("SYSML_LIBRARY"),
+        _library_stats(),
+    ]
+    blob = json.dumps([jar.st_mtime_ns, jar.st_size, environment,
+                       [str(a) for a in args], inputs])
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _evict_run_cache():
+    """Keep at most _RUN_CACHE_MAX_ENTRIES results, dropping least recently used."""
+    entries = []
+    for path in _RUN_CACHE.glob("*.json"):
+        try:
+            entries.append((path.stat().st_atime, path))
+        except FileNotFoundError:  # evicted by another worker meanwhile
+            pass
+    if len(entries) <= _RUN_CACHE_MAX_ENTRIES:
+        return
+    entries.sort()
+    for _atime, stale in entries[:-_RUN_CACHE_MAX_ENTRIES]:
+        stale.unlink(missing_ok=True)
+
+
+def disk_cached(run):
+    """Memoize ``run(*args, cwd=None) -> (rc, out, err)`` in test/.runcache/.
+
+    The key covers the JAR's mtime and size, the java binary, SYSML_JAVA_OPTS,
+    every file of the standard library the tool loads, the arguments, and the
+    mtime and size of every file they reference (directories are walked), so
+    rebuilding the JAR, switching the JDK, updating the library submodule or
+    touching a model invalidates the entry. SYSML_NO_DAEMON, SYSML_NO_CDS and
+    SYSML_DAEMON_STDIN are part of the key as well, so each execution mode
+    keeps its own results.
+
+    ``diagram`` calls are never cached because their effect is the files they
+    write, and neither are calls with a non-default cwd, whose relative paths
+    would be ambiguous, or runs killed by a signal (rc < 0).
+    """
+    @functools.wraps(run)
+    def wrapper(*args, cwd=None):
+        if (os.environ.get("SYSML_NO_RUNCACHE") == "1" or cwd is not None
+                or (args and str(args[0]) == "diagram")):
+            return run(*args, cwd=cwd)
+
+        entry = _RUN_CACHE / f"{_run_cache_key(args)}.json"
+        try:
+            result = tuple(json.loads(entry.read_text(encoding="utf-8")))
+            os.utime(entry)  # refresh atime for LRU eviction
+            return result
+        except (OSError, ValueError):
+            pass
+
+        result = run(*args)
+        if result[0] < 0:  # killed by a signal (e.g. OOM); don't persist it
+            return result
+        _RUN_CACHE.mkdir(exist_ok=True)
+        # Write-then-rename so concurrent workers/threads never see partial files.
+        tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(list(result)), encoding="utf-8")
+        os.replace(tmp, entry)
+        _evict_run_cache()
+        return result
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=None)
+def _read_model(path):
+    """Content of a model file, read once per session for the daemon."""
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+class JvmDaemon:
+    """Client for a ``sysmlv2-tool --daemon`` process.
+
+    The daemon reads one JSON request per line from stdin and answers each
+    with one ``@sysml-daemon {"id": …, "rc": …, "out": …, "err": …}`` line on
+    stdout (see ToolDaemon.java). Other stdout lines, such as JVM warnings,
+    are skipped, and the echoed id ties every reply to its request.
+
+    ``send()`` returns None whenever the daemon cannot serve a call — it failed
+    to start (e.g. a JAR built before --daemon existed), it died, or the call
+    needs a different working directory — so callers can fall back to a
+    one-shot subprocess. After any protocol error the daemon is killed and not
+    used again. Its stderr is kept in test/.jvm-cache/<name>-<worker>.log.
+    ``command`` replaces the ``java … --daemon`` command line (for tests).
+    """
+
+    def __init__(self, cwd, command=None, name="daemon"):
+        self.cwd = str(cwd)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._broken = False
+        worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+        _DAEMON_LOG_DIR.mkdir(exist_ok=True)
+        self._log = open(_DAEMON_LOG_DIR / f"{name}-{worker}.log", "w", encoding="utf-8")
+        try:
+            self._proc = subprocess.Popen(
+                command or java_command("--daemon", long_lived=True),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._log,
+                cwd=self.cwd,
+                text=True,
+                encoding="utf-8",
+            )
+        except OSError:
+            self._log.close()
+            raise
+
+    def send(self, args, cwd=None):
+        """Run one tool invocation in the daemon; returns (rc, out, err) or None.
+
+        With SYSML_DAEMON_STDIN=1 a single ``.sysml`` file argument is passed
+        with ``--stdin-file`` and its content sent along with the request, so
+        each model is read from disk once per session rather than once per
+        call. It is off by default so that the suite exercises the tool's own
+        file reading.
+        """
+        if cwd is not None and str(cwd) != self.cwd:
+            return None
+        args = [str(a) for a in args]
+        request = {"args": args, "cwd": self.cwd}
+        models = [a for a in args
+                  if a.endswith(".sysml") and os.path.isfile(os.path.join(self.cwd, a))]
+        if len(models) == 1 and os.environ.get("SYSML_DAEMON_STDIN") == "1":
+            request["args"] = ["--stdin-file", models[0], *args]
+            request["stdin"] = _read_model(os.path.join(self.cwd, models[0]))
+        with self._lock:
+            if self._broken or self._proc.poll() is not None:
+                return None
+            self._next_id += 1
+            request["id"] = self._next_id
+            try:
+                self._proc.stdin.write(json.dumps(request) + "\n")
+                self._proc.stdin.flush()
+                reply = self._read_reply()
+            except OSError:
+                reply = None
+            if (reply is None or reply.get("id") != request["id"]
+                    or not {"rc", "out", "err"} <= reply.keys()):
+                self._abandon()
+                return None
+        return reply["rc"], reply["out"], reply["err"]
+
+    @property
+    def alive(self):
+        """False once the daemon has exited or was abandoned."""
+        return not self._broken and self._proc.poll() is None
+
+    def _read_reply(self):
+        """Next protocol reply as a dict, or None on EOF or a malformed reply."""
+        while True:
+            line = self._proc.stdout.readline()
+            if not line:
+                return None
+            if line.startswith(_DAEMON_REPLY_PREFIX):
+                try:
+                    reply = json.loads(line[len(_DAEMON_REPLY_PREFIX):])
+                except ValueError:
+                    return None
+                return reply if isinstance(reply, dict) else None
+
+    def _abandon(self):
+        """Kill a daemon whose replies can no longer be trusted."""
+        self._broken = True
+        self._proc.kill()
+
+    def close(self):
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        self._log.close()
+
+
+_shared_daemon = None
+_shared_daemon_failed = False
+_shared_daemon_lock = threading.Lock()
+
+
+def shared_daemon():
+    """The JvmDaemon of this test process, started on first use.
+
+    Returns None when the daemon is disabled via SYSML_NO_DAEMON=1, could not
+    be started, or is no longer alive, so callers run one-shot JVMs instead.
+    """
+    global _shared_daemon, _shared_daemon_failed
+    if os.environ.get("SYSML_NO_DAEMON") == "1":
+        return None
+    with _shared_daemon_lock:
+        if _shared_daemon is None and not _shared_daemon_failed:
+            try:
+                _shared_daemon = JvmDaemon(_PROJECT_ROOT)
+            except OSError:
+                _shared_daemon_failed = True
+        if _shared_daemon is None or not _shared_daemon.alive:
+            return None
+        return _shared_daemon
+
+
+def close_shared_daemon():
+    """Stop the daemon started by shared_daemon(), if any."""
+    global _shared_daemon
+    with _shared_daemon_lock:
+        if _shared_daemon is not None:
+            _shared_daemon.close()
+            _shared_daemon = None